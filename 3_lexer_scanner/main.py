@@ -1,11 +1,11 @@
 import sys
-from lexer import Lexer, TokenType
+from lexer import RegexLexer, TokenType
 
 
-def read_file(file_path):
+def open_file(file_path):
+    # the file is lexed in chunks, not read whole
     try:
-        with open(file_path, 'r') as file:
-            return file.read()
+        return open(file_path, 'r')
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         sys.exit(1)
@@ -18,18 +18,19 @@ def main():
     # file path is passed as arg
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
-        text = read_file(file_path)
+        file = open_file(file_path)
     else:
         print("enter DSL input (Ctrl+D to end):")
-        text = sys.stdin.read()
+        file = sys.stdin
 
-    lexer = Lexer(text)
-    print("tokens:")
-    while True:
-        token = lexer.get_next_token()
-        print(token)
-        if token.type == TokenType.EOF:
-            break
+    with file:
+        lexer = RegexLexer.from_file(file)
+        print("tokens:")
+        while True:
+            token = lexer.get_next_token()
+            print(token)
+            if token.type == TokenType.EOF:
+                break
 
 
 if __name__ == "__main__":
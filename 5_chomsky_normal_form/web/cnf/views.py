@@ -1,6 +1,6 @@
 from django.shortcuts import render
 from .forms import GrammarBasicForm, generate_production_form
-from fa import Grammar
+from fa import Grammar, default_cache
 
 
 def grammar_view(request):
@@ -44,7 +44,7 @@ def grammar_view(request):
                             P[nt] = [r.strip() if r.strip() else "" for r in rhs.split(",")]
 
                     grammar = Grammar(V_n, V_t, P, S)
-                    normalization_steps = grammar.normalize_cnf()
+                    normalization_steps = grammar.normalize_cnf(cache=default_cache)
 
                     form = GrammarBasicForm()
                     production_form = None
@@ -1,13 +1,13 @@
 import sys
 import json
-from lexer import Lexer
+from lexer import RegexLexer
 from parser import Parser, ast_to_dict
 
 
-def read_file(file_path):
+def open_file(file_path):
+    # the file is lexed in chunks, not read whole
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        return open(file_path, 'r', encoding='utf-8')
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         sys.exit(1)
@@ -19,24 +19,25 @@ def read_file(file_path):
 def main():
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
-        text = read_file(file_path)
+        file = open_file(file_path)
     else:
         print("Enter DSL input (Ctrl+D to end):")
-        text = sys.stdin.read()
+        file = sys.stdin
 
-    lexer = Lexer(text)
-    parser = Parser(lexer)
+    with file:
+        lexer = RegexLexer.from_file(file)
+        parser = Parser(lexer)
 
-    try:
-        ast = parser.parse_program()
+        try:
+            ast = parser.parse_program()
 
-        print("\nAbstract Syntax Tree (AST):\n")
-        ast_dict = ast_to_dict(ast)
-        print(json.dumps(ast_dict, indent=2))
+            print("\nAbstract Syntax Tree (AST):\n")
+            ast_dict = ast_to_dict(ast)
+            print(json.dumps(ast_dict, indent=2))
 
-    except Exception as e:
-        print(f"Error: {e}")
-        sys.exit(1)
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,18 @@
+from common import random_automaton, random_strings, timed
+
+
+def main():
+    for num_states in (100, 300, 600):
+        nfa = random_automaton(num_states, fanout=4, density=0.5, seed=num_states)
+        words = random_strings(2000, min_length=10, max_length=40)
+        print(f"\nNFA with {num_states} states, {len(words)} strings")
+
+        _, bitset = timed("bitset_nfa()", nfa.bitset_nfa, repeat=1)
+        baseline, expected = timed("string_belongs_to_language", lambda: [nfa.string_belongs_to_language(w) for w in words])
+        fast, actual = timed("BitsetNFA.matches", lambda: [bitset.matches(w) for w in words])
+        assert expected == actual
+        print(f"accepted: {sum(actual)}, speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import random
+
+from common import timed
+
+from fa import Grammar
+
+
+def balanced(length, seed=0):
+    # random balanced parentheses word of the given (even) length
+    rng = random.Random(seed)
+    word, depth = [], 0
+    for position in range(length):
+        remaining = length - position
+        if depth and (depth == remaining or rng.random() < 0.5):
+            word.append(")")
+            depth -= 1
+        else:
+            word.append("(")
+            depth += 1
+    return "".join(word)
+
+
+def main():
+    dyck = Grammar({"S"}, {"(", ")"}, {"S": ["", "(S)S"]}, {"S"})
+    dyck_cnf = Grammar(
+        {"S", "L", "R", "A"}, {"(", ")"},
+        {"S": [["L", "R"], ["L", "A"], ["S", "S"]], "A": [["S", "R"]], "L": ["("], "R": [")"]},
+        {"S"},
+    )
+    cyk = dyck_cnf.cyk_parser()
+    earley = dyck.earley_parser()
+
+    for length in (250, 500, 1000, 2000):
+        word = balanced(length)
+        _, accepted = timed(f"CYK, n={length}", cyk.accepts, word, repeat=1)
+        assert accepted
+    _, (roots, forest) = timed("CYK parse forest, n=100", cyk.parse_forest, balanced(100), repeat=1)
+    print(f"  forest nodes: {len(forest)}")
+
+    for length in (500, 1000, 2000, 4000):
+        word = balanced(length)
+        _, accepted = timed(f"Earley, n={length}", earley.accepts, word, repeat=1)
+        assert accepted and not earley.accepts(word + "(")
+
+
+if __name__ == "__main__":
+    main()
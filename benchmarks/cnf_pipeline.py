@@ -0,0 +1,35 @@
+import random
+
+from common import timed
+
+from fa import Grammar
+
+
+def random_grammar(num_non_terminals, productions_per_symbol=5, max_length=4, seed=0):
+    # multi-character non-terminal names, so right-hand sides are symbol lists
+    rng = random.Random(seed)
+    non_terminals = [f"N{i}" for i in range(num_non_terminals)]
+    terminals = ["a", "b", "c"]
+    P = {}
+    for lhs in non_terminals:
+        P[lhs] = []
+        for _ in range(productions_per_symbol):
+            length = rng.randint(1, max_length)
+            unit_bias = 0.1 if length == 1 else 0.6  # keep unit chains short
+            P[lhs].append([rng.choice(non_terminals) if rng.random() < unit_bias else rng.choice(terminals) for _ in range(length)])
+        if rng.random() < 0.05:
+            P[lhs].append("")
+    return Grammar(set(non_terminals), set(terminals), P, {"N0"})
+
+
+def main():
+    for num_non_terminals in (200, 2000, 10000):
+        grammar = random_grammar(num_non_terminals)
+        productions = sum(len(rhs_list) for rhs_list in grammar.P.values())
+        print(f"\n{num_non_terminals} non-terminals, {productions} productions")
+        _, cnf = timed("to_cnf()", grammar.to_cnf, repeat=1)
+        print(f"  CNF productions: {sum(len(rhs_list) for rhs_list in cnf.P.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), ".."))
+
+from fa import FiniteAutomaton
+
+
+def random_automaton(num_states, alphabet="abc", fanout=1, density=0.9, seed=0):
+    # fanout > 1 gives an NFA with up to `fanout` targets per (state, symbol)
+    rng = random.Random(seed)
+    states = [f"q{i}" for i in range(num_states)]
+    transitions = {}
+    for state in states:
+        transitions[state] = {}
+        for symbol in alphabet:
+            if rng.random() < density:
+                transitions[state][symbol] = set(rng.sample(states, rng.randint(1, fanout)))
+    accept_states = set(rng.sample(states, max(1, num_states // 3)))
+    return FiniteAutomaton(set(states), set(alphabet), transitions, states[0], accept_states)
+
+
+def nth_from_last_nfa(k):
+    # (a|b)* a (a|b)^k: k + 2 NFA states, 2^(k + 1) reachable subsets
+    states = {f"q{i}" for i in range(k + 2)}
+    transitions = {"q0": {"a": {"q0", "q1"}, "b": {"q0"}}}
+    for i in range(1, k + 1):
+        transitions[f"q{i}"] = {"a": {f"q{i + 1}"}, "b": {f"q{i + 1}"}}
+    return FiniteAutomaton(states, {"a", "b"}, transitions, "q0", {f"q{k + 1}"})
+
+
+def substring_nfa(length, seed=0):
+    # (a|b)* w (a|b)* for a random w: length + 1 NFA states, large but few (about 2 * length) subsets
+    rng = random.Random(seed)
+    word = "".join(rng.choice("ab") for _ in range(length))
+    states = [f"q{i}" for i in range(length + 1)]
+    transitions = {state: {} for state in states}
+    for i, symbol in enumerate(word):
+        transitions[states[i]].setdefault(symbol, set()).add(states[i + 1])
+    for state in (states[0], states[-1]):
+        for symbol in "ab":
+            transitions[state].setdefault(symbol, set()).add(state)
+    return FiniteAutomaton(set(states), {"a", "b"}, transitions, states[0], {states[-1]})
+
+
+def random_strings(count, alphabet="abc", min_length=5, max_length=30, seed=1):
+    rng = random.Random(seed)
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(min_length, max_length))) for _ in range(count)]
+
+
+def timed(label, func, *args, repeat=3):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<40} {best * 1000:10.2f} ms")
+    return best, result
+
+
+def timeline_dsl(num_blocks, seed=0):
+    # DSL source in the style of 3_lexer_scanner/input.dsl, about 110 bytes per block
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(num_blocks):
+        kind = rng.choice(("event", "period"))
+        importance = rng.choice(("high", "medium", "low"))
+        if kind == "event":
+            body = f'    date = {rng.randint(1, 28)}-{rng.randint(1, 12):02d}-{rng.randint(1, 2000)} BCE ;\n'
+        else:
+            body = f'    start = {rng.randint(1, 2000)} BCE ;\n    end = {rng.randint(1, 2000)} CE ;\n'
+        blocks.append(
+            f'{kind} item{i} {{\n    title = "Item number {i}";\n{body}    importance = {importance} ;\n}}\n\n'
+        )
+    blocks.append("main {\n    for item in history {\n        if ( item.year <= 0) {\n            export item;\n        }\n    }\n}\n")
+    return "".join(blocks)
@@ -0,0 +1,18 @@
+from common import random_automaton, random_strings, timed
+
+
+def main():
+    for num_states in (10, 100, 1000):
+        dfa = random_automaton(num_states)
+        words = random_strings(20000)
+        print(f"\nDFA with {num_states} states, {len(words)} strings")
+
+        _, compiled = timed("compile() (cached afterwards)", dfa.compile, repeat=1)
+        baseline, expected = timed("string_belongs_to_language", lambda: [dfa.string_belongs_to_language(w) for w in words])
+        fast, actual = timed("CompiledDFA.matches", lambda: [compiled.matches(w) for w in words])
+        assert expected == actual
+        print(f"speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
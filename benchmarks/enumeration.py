@@ -0,0 +1,43 @@
+from itertools import islice, product
+
+from common import random_automaton, timed
+
+from fa import Grammar
+
+
+def brute_force_counts(automaton, max_length):
+    dfa = automaton.compile()
+    symbols = sorted(automaton.alphabet)
+    return [sum(dfa.matches("".join(word)) for word in product(symbols, repeat=n)) for n in range(max_length + 1)]
+
+
+def main():
+    automaton = random_automaton(1000, "abc", seed=3)
+    dfa = automaton.compile()
+    print(f"random DFA with {dfa.num_states} states")
+    timed("brute force, lengths <= 9", brute_force_counts, automaton, 9, repeat=1)
+    timed("count_words(9)", dfa.count_words, 9)
+    timed("count_words(200)", dfa.count_words, 200)
+    small = random_automaton(100, "abc", seed=3).compile()
+    timed("100 states, count_words(1000)", small.count_words, 1000, repeat=1)
+    timed("100 states, count_words_of_length(39)", small.count_words_of_length, 39, repeat=1)
+    timed("first 100000 enumerated words", lambda: list(islice(dfa.enumerate_words(50), 100000)))
+
+    dyck = Grammar({"S"}, {"(", ")"}, {"S": ["", "(S)S"]}, {"S"})
+    print("\nDyck grammar")
+    timed("brute force Earley, lengths <= 14", lambda: [
+        sum(dyck.earley_parser().accepts("".join(word)) for word in product("()", repeat=n)) for n in range(15)
+    ], repeat=1)
+    timed("count_words(14), by enumeration", dyck.count_words, 14, repeat=1)
+    _, derivations = timed("count_words(22, unambiguous=True)", lambda: dyck.count_words(22, unambiguous=True))
+    assert derivations[:15] == dyck.count_words(14)
+
+    lab1 = Grammar({"S", "F", "D"}, {"a", "b", "c"}, {"S": ["aF", "bS"], "F": ["bF", "cD", "a"], "D": ["cS", "a"]}, "S")
+    print("\nlab 1 regular grammar")
+    _, counts = timed("count_words(22) on its DFA", lab1.count_words, 22)
+    timed("first 100000 enumerated words", lambda: list(islice(lab1.enumerate_words(22), 100000)))
+    assert counts[:9] == [sum(1 for word in lab1.enumerate_words(8) if len(word) == n) for n in range(9)]
+
+
+if __name__ == "__main__":
+    main()
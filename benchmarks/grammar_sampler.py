@@ -0,0 +1,23 @@
+from common import timed
+
+from fa import Grammar
+
+
+def main():
+    # grammar from lab 1, variant 12, and the Dyck language
+    grammars = {
+        "lab 1 grammar": Grammar({"S", "F", "D"}, {"a", "b", "c"}, {"S": ["aF", "bS"], "F": ["bF", "cD", "a"], "D": ["cS", "a"]}, "S"),
+        "Dyck grammar": Grammar({"S"}, {"(", ")"}, {"S": ["", "(S)S"]}, {"S"}),
+    }
+    count = 100000
+    for name, grammar in grammars.items():
+        print(f"\n{name}")
+        sampler = grammar.sampler(seed=0)
+        elapsed, _ = timed(f"sampler.strings({count}, max_length=20)", lambda: list(sampler.strings(count, max_length=20)), repeat=1)
+        print(f"  {count / elapsed * 60:,.0f} words per minute")
+        elapsed, _ = timed(f"sampler.uniform_strings(20, {count})", lambda: list(sampler.uniform_strings(20, count)), repeat=1)
+        print(f"  {count / elapsed * 60:,.0f} words per minute")
+
+
+if __name__ == "__main__":
+    main()
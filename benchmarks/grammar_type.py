@@ -0,0 +1,26 @@
+from common import timed
+
+from symbol_table import right_linear_grammar
+
+
+def main():
+    for num_non_terminals in (10000, 50000):
+        grammar = right_linear_grammar(num_non_terminals)
+        print(f"\n{num_non_terminals} non-terminals, {num_non_terminals * 5} productions")
+        timed("get_grammar_type(), building the index", grammar.get_grammar_type, repeat=1)
+        timed("get_grammar_type(), index built", grammar.get_grammar_type)
+
+        def edit_session(edits=1000):
+            # interactive editing: change one rule, show the type, undo it
+            for i in range(edits):
+                grammar.add_production("N0", f"N{i}a")
+                grammar.get_grammar_type()
+                grammar.remove_production("N0", f"N{i}a")
+                grammar.get_grammar_type()
+
+        timed("1000 add/remove edits with type reads", edit_session)
+        print(f"  {grammar.get_grammar_type()[1]}")
+
+
+if __name__ == "__main__":
+    main()
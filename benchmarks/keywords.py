@@ -0,0 +1,53 @@
+import random
+
+from common import timed
+
+from lexer import Lexer, RegexLexer, TokenType
+from lexer.Keywords import KEYWORDS
+
+
+def keyword_dense_dsl(num_words, keyword_share=0.8, num_identifiers=200, seed=0):
+    # words separated by single spaces and semicolons, keyword_share of them reserved words
+    # (cause-effect included), the rest drawn from a small pool of identifiers
+    rng = random.Random(seed)
+    keywords = sorted(KEYWORDS)
+    identifiers = [f"name_{i}" for i in range(num_identifiers)]
+    words = [rng.choice(keywords) if rng.random() < keyword_share else rng.choice(identifiers) for _ in range(num_words)]
+    return " ;\n".join(" ".join(words[i:i + 8]) for i in range(0, num_words, 8))
+
+
+def rebuilt_table(word):
+    # the lookup as Lexer.identifier used to do it: a fresh 35-entry dict for every word
+    keywords = {word: token_type for word, token_type in KEYWORDS.items()}
+    return keywords.get(word, TokenType.ID)
+
+
+def lookup_all(lookup, words):
+    for word in words:
+        lookup(word)
+
+
+def identifier_values(lexer_class, text):
+    lexer = lexer_class(text)
+    values = []
+    while (token := lexer.get_next_token()).type != TokenType.EOF:
+        if token.type == TokenType.ID:
+            values.append(token.value)
+    return values
+
+
+def main():
+    text = keyword_dense_dsl(200000)
+    words = text.split()
+    print(f"{len(words)} words, {len(text) / 1e6:.1f} MB")
+    timed("rebuilt table per word", lookup_all, rebuilt_table, words[:20000], repeat=1)
+    print("  (20000 words only)")
+    timed("KEYWORDS.get", lookup_all, KEYWORDS.get, words)
+
+    for lexer_class in (Lexer, RegexLexer):
+        _, values = timed(f"{lexer_class.__name__} on keyword-dense text", identifier_values, lexer_class, text, repeat=1)
+        print(f"  {len(values)} identifiers, {len({id(value) for value in values})} distinct string objects")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from common import nth_from_last_nfa, random_automaton, random_strings, timed
+
+
+def run(label, nfa, words, cache_sizes):
+    print(f"\n{label}, {len(words)} strings")
+    baseline, expected = timed("string_belongs_to_language", lambda: [nfa.string_belongs_to_language(w) for w in words], repeat=1)
+    bitset = nfa.bitset_nfa()
+    timed("BitsetNFA.matches", lambda: [bitset.matches(w) for w in words], repeat=1)
+    for max_states in cache_sizes:
+        lazy = nfa.lazy_dfa(max_states)
+        fast, actual = timed(f"LazyDFA.matches (max_states={max_states})", lambda: [lazy.matches(w) for w in words], repeat=1)
+        assert expected == actual
+        print(f"  {lazy.stats()}, speedup: {baseline / fast:.1f}x")
+
+
+def main():
+    nfa = random_automaton(300, alphabet="ab", fanout=3, density=0.6, seed=7)
+    run("random NFA with 300 states", nfa, random_strings(20000, alphabet="ab"), (100, 10000))
+
+    # eager determinisation of this NFA would produce 2^21 states
+    nfa = nth_from_last_nfa(20)
+    words = random_strings(1000, alphabet="ab", min_length=20, max_length=40, seed=3)
+    run("(a|b)*a(a|b)^20, repeated corpus", nfa, words * 10, (1000, 100000))
+
+
+if __name__ == "__main__":
+    main()
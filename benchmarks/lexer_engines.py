@@ -0,0 +1,44 @@
+from common import timed, timeline_dsl
+
+from lexer import Lexer, RegexLexer, TokenType
+from lexer.RegexLexer import TOKEN_PATTERN
+
+
+def count_tokens(lexer_class, text):
+    lexer = lexer_class(text)
+    count = 0
+    while lexer.get_next_token().type != TokenType.EOF:
+        count += 1
+    return count
+
+
+def drain(text):
+    return sum(1 for _ in RegexLexer(text).tokens())
+
+
+def scan_only(text):
+    # the master pattern's matches and nothing else: a floor for any engine built on it
+    return sum(1 for _ in iter(TOKEN_PATTERN.scanner(text).match, None))
+
+
+def main():
+    text = timeline_dsl(20000)
+    print(f"{len(text) / 1e6:.1f} MB of DSL")
+    baseline, tokens = timed("Lexer (per character)", count_tokens, Lexer, text, repeat=1)
+    elapsed, regex_tokens = timed("RegexLexer (master pattern)", count_tokens, RegexLexer, text)
+    assert tokens == regex_tokens
+    generator, _ = timed("RegexLexer.tokens() generator", drain, text)
+    columnar, _ = timed("RegexLexer.tokenize_all()", lambda: RegexLexer(text).tokenize_all())
+    floor, _ = timed("TOKEN_PATTERN matches only", scan_only, text)
+    print(f"  {tokens} tokens, {len(text) / elapsed / 1e6:.1f} MB/s")
+    print(f"  speedup over Lexer: {baseline / elapsed:.1f}x get_next_token, {baseline / generator:.1f}x tokens(), "
+          f"{baseline / columnar:.1f}x tokenize_all(), at most {baseline / floor:.1f}x for the pattern alone")
+
+    text = timeline_dsl(100000)
+    print(f"\n{len(text) / 1e6:.1f} MB of DSL")
+    elapsed, tokens = timed("RegexLexer.tokens() generator", drain, text, repeat=1)
+    print(f"  {tokens} tokens, {len(text) / elapsed / 1e6:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import tracemalloc
+
+from common import timed, timeline_dsl
+
+from lexer import RegexLexer, TokenType
+
+
+def count_tokens(lexer):
+    count = 0
+    while lexer.get_next_token().type != TokenType.EOF:
+        count += 1
+    return count
+
+
+def lex_text(path):
+    with open(path, encoding="utf-8") as file:
+        return count_tokens(RegexLexer(file.read()))
+
+
+def lex_stream(path):
+    with open(path, encoding="utf-8") as file:
+        return count_tokens(RegexLexer.from_file(file))
+
+
+def peak_memory(func, *args):
+    # the streamed peak still grows slowly with the number of distinct identifiers, which stay interned
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        for num_blocks in (5000, 20000):
+            path = os.path.join(directory, "timeline.dsl")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(timeline_dsl(num_blocks))
+            print(f"\n{os.path.getsize(path) / 1e6:.1f} MB file")
+            _, tokens = timed("RegexLexer(file.read())", lex_text, path, repeat=1)
+            _, streamed = timed("RegexLexer.from_file(file)", lex_stream, path, repeat=1)
+            assert tokens == streamed
+            print(f"  {tokens} tokens")
+            print(f"  peak memory: {peak_memory(lex_text, path) / 1e6:.1f} MB whole text, "
+                  f"{peak_memory(lex_stream, path) / 1e6:.2f} MB streamed")
+
+
+if __name__ == "__main__":
+    main()
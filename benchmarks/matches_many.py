@@ -0,0 +1,18 @@
+from common import random_automaton, random_strings, timed
+
+
+def main():
+    for num_strings in (10000, 100000):
+        dfa = random_automaton(200, density=1.0)
+        compiled = dfa.compile()
+        words = random_strings(num_strings)
+        print(f"\nDFA with 200 states, {num_strings} strings")
+
+        baseline, expected = timed("CompiledDFA.matches (loop)", lambda: [compiled.matches(w) for w in words])
+        fast, actual = timed("CompiledDFA.matches_many", compiled.matches_many, words)
+        assert expected == actual.tolist()
+        print(f"speedup: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
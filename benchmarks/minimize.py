@@ -0,0 +1,32 @@
+import random
+from array import array
+
+from common import timed
+
+from fa import CompiledDFA
+
+
+def random_dfa(num_states, width=2, copies=1, seed=0):
+    # complete random DFA; with copies > 1 every state gets equivalent duplicates so minimisation has work to do
+    rng = random.Random(seed)
+    base = num_states // copies
+    targets = [[rng.randrange(base) for _ in range(width)] for _ in range(base)]
+    accepting = [rng.random() < 0.5 for _ in range(base)]
+    table = array('i', [0]) * (num_states * width)
+    for state in range(num_states):
+        for symbol in range(width):
+            table[state * width + symbol] = targets[state % base][symbol] + base * rng.randrange(copies)
+    return CompiledDFA(list(range(num_states)), ["a", "b", "c"][:width], table, 0,
+                       bytearray(accepting[state % base] for state in range(num_states)))
+
+
+def main():
+    for num_states in (10000, 100000):
+        for copies in (1, 10):
+            dfa = random_dfa(num_states, copies=copies)
+            _, minimal = timed(f"minimize() {num_states} states, copies={copies}", dfa.minimize, repeat=1)
+            print(f"  reachable: {len(dfa.reachable_states())}, minimal: {minimal.num_states}")
+
+
+if __name__ == "__main__":
+    main()
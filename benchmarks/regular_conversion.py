@@ -0,0 +1,38 @@
+import random
+
+from common import random_automaton, timed
+
+from fa import Grammar
+
+
+def linear_grammar(num_non_terminals, productions_per_symbol=4, left=False, seed=0):
+    rng = random.Random(seed)
+    non_terminals = [f"N{i}" for i in range(num_non_terminals)]
+    P = {}
+    for lhs in non_terminals:
+        rules = [[rng.choice(non_terminals), rng.choice("ab")] if left else [rng.choice("ab"), rng.choice(non_terminals)]
+                 for _ in range(productions_per_symbol)]
+        P[lhs] = rules + [rng.choice("ab")]
+    return Grammar(set(non_terminals), {"a", "b"}, P, "N0")
+
+
+def main():
+    num_non_terminals = 20000
+    for left in (False, True):
+        grammar = linear_grammar(num_non_terminals, left=left)
+        kind = "left" if left else "right"
+        print(f"\n{kind}-linear grammar, {num_non_terminals * 5} productions")
+        _, automaton = timed("to_finite_automaton()", grammar.to_finite_automaton, repeat=1)
+        transitions = sum(len(targets) for row in automaton.transitions.values() for targets in row.values())
+        print(f"  {len(automaton.states)} states, {transitions} transitions")
+        _, back = timed("to_grammar() of the result", automaton.to_grammar, repeat=1)
+        print(f"  {sum(len(rules) for rules in back.P.values())} productions")
+
+    automaton = random_automaton(50000, "ab", fanout=2, density=1.0)
+    print("\nrandom NFA, 50000 states")
+    _, grammar = timed("to_grammar()", automaton.to_grammar, repeat=1)
+    print(f"  {sum(len(rules) for rules in grammar.P.values())} productions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import contextlib
+import io
+import random
+import tempfile
+
+from common import nth_from_last_nfa, timed
+
+from fa import Grammar, ResultCache
+from regular_conversion import linear_grammar
+
+
+def nullable_grammar(seed=0):
+    # single-character symbols, as normalize_cnf expects; every non-terminal is nullable
+    rng = random.Random(seed)
+    non_terminals = [chr(code) for code in range(ord("A"), ord("U")) if chr(code) != "S"]
+    P = {"S": ["".join(rng.choice(non_terminals) for _ in range(6))]}
+    for symbol in non_terminals:
+        P[symbol] = ["", "".join(rng.choice(non_terminals + ["a", "b"]) for _ in range(6)), rng.choice("ab")]
+    return Grammar(set(non_terminals) | {"S"}, {"a", "b"}, P, "S")
+
+
+def main():
+    cache = ResultCache(directory=tempfile.mkdtemp())
+
+    grammar = linear_grammar(20000)
+    print(f"\nright-linear grammar, {sum(len(rules) for rules in grammar.P.values())} productions")
+    timed("canonical_hash()", linear_grammar(20000).canonical_hash, repeat=1)
+    timed("to_finite_automaton(), no cache", linear_grammar(20000).to_finite_automaton, repeat=1)
+    timed("to_finite_automaton(cache), miss", grammar.to_finite_automaton, cache, repeat=1)
+    timed("to_finite_automaton(cache), hit", grammar.to_finite_automaton, cache, repeat=1)
+    timed("hit for an equal, unhashed grammar", linear_grammar(20000).to_finite_automaton, cache, repeat=1)
+    timed("writing the directory entry, flush()", cache.flush, repeat=1)
+    timed("on-disk hit in a new cache", linear_grammar(20000).to_finite_automaton,
+          ResultCache(directory=cache.directory), repeat=1)
+
+    nfa = nth_from_last_nfa(14)
+    print("\n(a|b)* a (a|b)^14 NFA")
+    timed("nfa_to_dfa(), no cache", nfa.nfa_to_dfa, repeat=1)
+    timed("nfa_to_dfa(cache), miss", nfa.nfa_to_dfa, False, cache, repeat=1)
+    timed("nfa_to_dfa(cache), hit", nfa.nfa_to_dfa, False, cache, repeat=1)
+    timed("hit for an equal, unhashed NFA", nth_from_last_nfa(14).nfa_to_dfa, False, cache, repeat=1)
+    timed("writing the directory entry, flush()", cache.flush, repeat=1)
+    timed("on-disk hit in a new cache", nth_from_last_nfa(14).nfa_to_dfa, False,
+          ResultCache(directory=cache.directory), repeat=1)
+
+    print("\nnormalize_cnf() of a grammar with 20 nullable non-terminals")
+
+    def normalize(cache=None):
+        grammar = nullable_grammar()
+        with contextlib.redirect_stdout(io.StringIO()):
+            return grammar.normalize_cnf(cache)
+
+    timed("no cache", normalize, repeat=1)
+    timed("cache miss", normalize, cache, repeat=1)
+    timed("cache hit", normalize, cache, repeat=1)
+    cache.flush()
+    timed("on-disk hit in a new cache", normalize, ResultCache(directory=cache.directory), repeat=1)
+    print(f"  {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import os
+import pickle
+import tempfile
+
+from common import random_automaton, timed
+
+from fa import CompiledDFA
+
+
+def main():
+    dfa = random_automaton(200000, density=1.0)
+    compiled = dfa.compile()
+    with tempfile.TemporaryDirectory() as directory:
+        pickle_path = os.path.join(directory, "dfa.pickle")
+        binary_path = os.path.join(directory, "dfa.bin")
+        print(f"DFA with {compiled.num_states} states")
+
+        timed("pickle.dump(FiniteAutomaton)", lambda: pickle.dump(dfa, open(pickle_path, "wb")), repeat=1)
+        timed("pickle.load", lambda: pickle.load(open(pickle_path, "rb")), repeat=1)
+        timed("CompiledDFA.save", compiled.save, binary_path, repeat=1)
+        _, loaded = timed("CompiledDFA.load (mmap)", CompiledDFA.load, binary_path)
+        print(f"pickle: {os.path.getsize(pickle_path)} bytes, binary: {os.path.getsize(binary_path)} bytes")
+        assert loaded.matches("abcabc") == compiled.matches("abcabc")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+from common import nth_from_last_nfa, substring_nfa, timed
+
+
+def main():
+    for k in (8, 11, 14):
+        nfa = nth_from_last_nfa(k)
+        print(f"\n(a|b)*a(a|b)^{k}: {k + 2} NFA states")
+        _, dfa = timed("nfa_to_dfa(compiled=True)", nfa.nfa_to_dfa, True, repeat=1)
+        _, automaton = timed("nfa_to_dfa()", nfa.nfa_to_dfa, repeat=1)
+        print(f"DFA states: {dfa.num_states}, {len(automaton.states)}")
+
+    for length in (1000, 3000):
+        nfa = substring_nfa(length)
+        print(f"\n(a|b)*w(a|b)*, |w| = {length}: {length + 1} NFA states")
+        _, dfa = timed("nfa_to_dfa(compiled=True)", nfa.nfa_to_dfa, True, repeat=1)
+        print(f"DFA states: {dfa.num_states}")
+
+
+if __name__ == "__main__":
+    main()
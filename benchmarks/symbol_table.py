@@ -0,0 +1,32 @@
+import random
+
+from common import timed
+
+from fa import Grammar
+
+
+def right_linear_grammar(num_non_terminals, productions_per_symbol=4, seed=0):
+    # productions are plain strings over multi-character names ("abN17"), split by longest match
+    rng = random.Random(seed)
+    non_terminals = [f"N{i}" for i in range(num_non_terminals)]
+    terminals = ["a", "b", "ab"]
+    P = {
+        lhs: [rng.choice(terminals) + rng.choice(non_terminals) for _ in range(productions_per_symbol)] + [rng.choice(terminals)]
+        for lhs in non_terminals
+    }
+    return Grammar(set(non_terminals), set(terminals), P, {"N0"})
+
+
+def main():
+    for num_non_terminals in (1000, 10000, 50000):
+        grammar = right_linear_grammar(num_non_terminals)
+        print(f"\n{num_non_terminals} non-terminals, {num_non_terminals * 5} productions")
+        timed("productions() as int tuples", grammar.productions)
+        _, grammar_type = timed("get_grammar_type()", grammar.get_grammar_type)
+        print(f"  {grammar_type[1]}")
+        _, automaton = timed("to_finite_automaton()", grammar.to_finite_automaton, repeat=1)
+        print(f"  {len(automaton.states)} states, alphabet {sorted(automaton.alphabet)}")
+
+
+if __name__ == "__main__":
+    main()
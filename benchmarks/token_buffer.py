@@ -0,0 +1,40 @@
+import tracemalloc
+
+from common import timed, timeline_dsl
+
+from lexer import RegexLexer
+
+
+def token_list(text):
+    return list(RegexLexer(text))
+
+
+def token_buffer(text):
+    return RegexLexer(text).tokenize_all()
+
+
+def retained_memory(func, *args):
+    # bytes still allocated by the result once func has returned
+    tracemalloc.start()
+    result = func(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    text = timeline_dsl(20000)
+    print(f"{len(text) / 1e6:.1f} MB of DSL")
+    _, tokens = timed("list(RegexLexer(text))", token_list, text)
+    _, buffer = timed("RegexLexer(text).tokenize_all()", token_buffer, text)
+    assert len(tokens) == len(buffer)
+    print(f"  {len(buffer)} tokens, {buffer.nbytes() / 1e6:.1f} MB of arrays")
+    timed("values of all tokens", lambda: [buffer.value(index) for index in range(len(buffer))], repeat=1)
+
+    print(f"  retained: {retained_memory(token_list, text) / 1e6:.1f} MB as Tokens, "
+          f"{retained_memory(token_buffer, text) / 1e6:.1f} MB as TokenBuffer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import tracemalloc
+
+from common import timed, timeline_dsl
+
+from lexer import RegexLexer, Token, TokenType
+from parser import Parser
+
+# the previous layout, for comparison: a Token with a per-instance __dict__
+class DictToken:
+    def __init__(self, type_, value, line, column):
+        self.type = type_
+        self.value = value
+        self.line = line
+        self.column = column
+
+
+def retained_memory(func, *args):
+    tracemalloc.start()
+    result = func(*args)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def as_dict_tokens(tokens):
+    return [DictToken(token.type, token.value, token.line, token.column) for token in tokens]
+
+
+def count_identifiers(tokens, identifier):
+    return sum(1 for token in tokens if token.type == identifier)
+
+
+def main():
+    text = timeline_dsl(46500)
+    tokens = list(RegexLexer(text))
+    print(f"{len(tokens)} tokens, {len(text) / 1e6:.1f} MB of DSL")
+
+    timed("list(RegexLexer(text))", lambda: list(RegexLexer(text)), repeat=1)
+    timed("parse_program()", lambda: Parser(RegexLexer(text)).parse_program(), repeat=1)
+
+    old_tokens = as_dict_tokens(tokens)
+    timed("type == ID, __slots__", count_identifiers, tokens, TokenType.ID)
+    timed("type == ID, __dict__", count_identifiers, old_tokens, TokenType.ID)
+
+    slots = retained_memory(lambda: [Token(token.type, token.value, token.line, token.column) for token in tokens])
+    dicts = retained_memory(as_dict_tokens, tokens)
+    print(f"  token objects: {slots / 1e6:.1f} MB with __slots__, {dicts / 1e6:.1f} MB with __dict__")
+
+
+if __name__ == "__main__":
+    main()
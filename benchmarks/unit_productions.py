@@ -0,0 +1,29 @@
+from common import timed
+
+from fa import Grammar
+
+
+def unit_chain(length, cyclic=False):
+    # N0 -> N1 -> ... -> N{length-1} (-> N0 when cyclic), every symbol also has one own production
+    non_terminals = [f"N{i}" for i in range(length)]
+    P = {symbol: [[symbol, "a"]] for symbol in non_terminals}
+    for i in range(length - 1):
+        P[non_terminals[i]].append(non_terminals[i + 1])
+    if cyclic:
+        P[non_terminals[-1]].append(non_terminals[0])
+    return Grammar(set(non_terminals), {"a"}, P, {"N0"})
+
+
+def main():
+    for length in (500, 2000):
+        grammar = unit_chain(length)
+        _, sizes = timed(f"unit chain of {length}", grammar.eliminate_unit_productions, repeat=1)
+        print(f"  largest unit closure: {max(sizes.values())}")
+    for length in (1000, 3000):
+        grammar = unit_chain(length, cyclic=True)
+        _, sizes = timed(f"unit cycle of {length} (one SCC)", grammar.eliminate_unit_productions, repeat=1)
+        print(f"  largest unit closure: {max(sizes.values())}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+from collections import deque
+
+from .SymbolTable import SymbolTable
+
+
+class BitsetNFA:
+    # NFA simulation on int bitmasks: bit i of the active mask is set when state i is active.
+    # For every symbol the successor masks are grouped per byte of the active mask, so one step
+    # is a lookup + OR for each non-zero byte instead of a loop over the active states. The tables
+    # cost 256 masks per 8 states and symbol, so a symbol only gets them after TABLE_AFTER dense
+    # steps on it; short runs and determinize() never build them.
+    TABLE_AFTER = 32
+
+    def __init__(self, labels, symbols, successors, start_mask, accept_mask):
+        self.labels = labels
+        self.symbols = symbols
+        self.symbol_table = SymbolTable(symbols)  # splits strings over multi-character symbols
+        self.symbol_index = self.symbol_table.index
+        self.successors = successors  # successors[symbol_id][state] = mask of next states
+        self.start_mask = start_mask
+        self.accept_mask = accept_mask
+        self.num_bytes = (len(labels) + 7) // 8
+        self.chunk_tables = [None] * len(successors)
+        self.dense_steps = [0] * len(successors)
+
+    @classmethod
+    def from_indexed(cls, indexed):
+        # successor masks already include the epsilon closures of the targets
+        successors = []
+        for symbol in range(len(indexed.symbols)):
+            successors.append([indexed.closure(row.get(symbol, ())) for row in indexed.delta])
+
+        start_mask = indexed.closure(indexed.starts)
+        accept_mask = 0
+        for state, accepting in enumerate(indexed.accepting):
+            if accepting:
+                accept_mask |= 1 << state
+        return cls(list(indexed.states), list(indexed.symbols), successors, start_mask, accept_mask)
+
+    def _build_chunk_tables(self, masks):
+        # tables[k][b] = OR of the successor masks of the states set in byte value b of chunk k
+        tables = []
+        for chunk in range(self.num_bytes):
+            base = chunk * 8
+            table = [0] * 256
+            for value in range(1, 256):
+                low = value & -value
+                state = base + low.bit_length() - 1
+                table[value] = table[value ^ low] | (masks[state] if state < len(masks) else 0)
+            tables.append(table)
+        return tables
+
+    def union(self, mask, symbol):
+        # OR of the successor masks of the states in mask, one state at a time
+        masks = self.successors[symbol]
+        next_mask = 0
+        while mask:
+            low = mask & -mask
+            next_mask |= masks[low.bit_length() - 1]
+            mask ^= low
+        return next_mask
+
+    def step(self, mask, symbol):
+        if mask.bit_count() < self.num_bytes:
+            return self.union(mask, symbol)  # sparse active set
+        tables = self.chunk_tables[symbol]
+        if tables is None:
+            self.dense_steps[symbol] += 1
+            if self.dense_steps[symbol] < self.TABLE_AFTER:
+                return self.union(mask, symbol)
+            tables = self.chunk_tables[symbol] = self._build_chunk_tables(self.successors[symbol])
+        next_mask = 0
+        for chunk, value in enumerate(mask.to_bytes(self.num_bytes, "little")):
+            if value:
+                next_mask |= tables[chunk][value]
+        return next_mask
+
+    def split(self, input_string):
+        if isinstance(input_string, str) and self.symbol_table.max_length > 1:
+            return self.symbol_table.split(input_string)
+        return input_string
+
+    def matches(self, input_string):
+        input_string = self.split(input_string)
+        symbol_index = self.symbol_index
+        mask = self.start_mask
+        for char in input_string:
+            symbol = symbol_index.get(char)
+            if symbol is None:
+                return False
+            mask = self.step(mask, symbol)
+            if not mask:
+                return False
+        return bool(mask & self.accept_mask)
+
+    def determinize(self):
+        # subset construction on masks: deque worklist, every subset interned to a dense id;
+        # the empty subset is left out (missing transition). Every subset is expanded once per
+        # symbol, so the chunk tables would not pay off: the plain successor masks are used
+        ids = {self.start_mask: 0}
+        masks = [self.start_mask]
+        rows = [{}]
+        queue = deque([0])
+        num_symbols = len(self.symbols)
+        while queue:
+            subset = queue.popleft()
+            mask = masks[subset]
+            row = rows[subset]
+            for symbol in range(num_symbols):
+                target = self.union(mask, symbol)
+                if not target:
+                    continue
+                target_id = ids.get(target)
+                if target_id is None:
+                    target_id = ids[target] = len(masks)
+                    masks.append(target)
+                    rows.append({})
+                    queue.append(target_id)
+                row[symbol] = target_id
+        return masks, rows
+
+    def active_states(self, mask):
+        labels = self.labels
+        states = set()
+        while mask:
+            low = mask & -mask
+            states.add(labels[low.bit_length() - 1])
+            mask ^= low
+        return states
+
+    def __repr__(self):
+        return f"BitsetNFA(states={len(self.labels)}, symbols={self.symbols})"
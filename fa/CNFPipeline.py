@@ -0,0 +1,259 @@
+import warnings
+from itertools import product
+
+from .SymbolTable import SymbolTable
+from .UnitProductions import UnitProductionGraph
+
+
+class CNFPipeline:
+    # non-mutating CNF conversion: symbols are interned to ints, productions are (lhs, rhs tuple)
+    # pairs and every analysis is a worklist over reverse-dependency indexes, so each step is
+    # linear in the size of the grammar it reads
+    def __init__(self, grammar, epsilon_mode="classic", max_expansion=1024):
+        if epsilon_mode not in ("classic", "binarize"):
+            raise ValueError(f"unknown epsilon_mode {epsilon_mode!r}")
+        self.epsilon_mode = epsilon_mode
+        self.max_expansion = max_expansion
+        self.source = grammar
+        self.table = SymbolTable()
+        self.names = self.table.names
+        self.index = self.table.index
+        self.terminals = set()
+        for terminal in sorted(grammar.V_t):
+            self.terminals.add(self._intern(terminal))
+        for non_terminal in sorted(grammar.V_n):
+            self._intern(non_terminal)
+        self.initial_starts = [self._intern(symbol) for symbol in sorted(grammar.S)]
+        self.starts = list(self.initial_starts)
+        self.counters = {}
+        self.unit_closure_sizes = {}
+
+        self.rules = {}
+        for lhs, rhs_list in grammar.P.items():
+            if lhs not in grammar.V_n:
+                raise ValueError(f"{lhs} -> ... is not a context-free production")
+            for rhs in rhs_list:
+                symbols = grammar.split_rhs(rhs)
+                unknown = [symbol for symbol in symbols if symbol not in self.index]
+                if unknown:
+                    raise ValueError(f"unknown symbols {unknown} in {lhs} -> {rhs}")
+                self._add(self.rules, self.index[lhs], tuple(self.index[symbol] for symbol in symbols))
+        self.steps = {}
+
+    def _intern(self, name):
+        return self.table.intern(name)
+
+    def _fresh(self, base):
+        name = base
+        counter = 0
+        while name in self.index:
+            name = f"{base}{counter}"
+            counter += 1
+        return self._intern(name)
+
+    def _numbered(self, prefix):
+        counter = self.counters.get(prefix, 0)
+        while f"{prefix}{counter}" in self.index:
+            counter += 1
+        self.counters[prefix] = counter + 1
+        return self._intern(f"{prefix}{counter}")
+
+    @staticmethod
+    def _add(rules, lhs, rhs):
+        alternatives = rules.setdefault(lhs, {})
+        alternatives[rhs] = None  # dict as an ordered set
+
+    @staticmethod
+    def _close(rules, counts):
+        # counts[(lhs, rhs)] = number of rhs occurrences still to be satisfied; a production fires
+        # when its count reaches 0, which satisfies its lhs everywhere it is used
+        users = {}
+        queue = []
+        remaining = {}
+        for (lhs, rhs), count in counts.items():
+            remaining[lhs, rhs] = count
+            if count == 0:
+                queue.append(lhs)
+            for symbol in rhs:
+                users.setdefault(symbol, []).append((lhs, rhs))
+        found = set()
+        while queue:
+            symbol = queue.pop()
+            if symbol in found:
+                continue
+            found.add(symbol)
+            for key in users.get(symbol, ()):
+                remaining[key] -= 1
+                if remaining[key] == 0:
+                    queue.append(key[0])
+        return found
+
+    def _productions(self, rules):
+        for lhs, alternatives in rules.items():
+            for rhs in alternatives:
+                yield lhs, rhs
+
+    def nullable(self, rules):
+        terminals = self.terminals
+        counts = {
+            (lhs, rhs): len(rhs)
+            for lhs, rhs in self._productions(rules)
+            if not any(symbol in terminals for symbol in rhs)
+        }
+        return self._close(rules, counts)
+
+    def productive(self, rules):
+        terminals = self.terminals
+        counts = {
+            (lhs, rhs): sum(1 for symbol in rhs if symbol not in terminals)
+            for lhs, rhs in self._productions(rules)
+        }
+        return self._close(rules, counts)
+
+    def reachable(self, rules):
+        seen = set(self.starts)
+        stack = list(self.starts)
+        while stack:
+            for rhs in rules.get(stack.pop(), ()):
+                for symbol in rhs:
+                    if symbol not in seen and symbol not in self.terminals:
+                        seen.add(symbol)
+                        stack.append(symbol)
+        return seen
+
+    def eliminate_epsilon(self, rules):
+        # a rhs with k nullable symbols expands to 2^k alternatives; productions that would exceed
+        # max_expansion (all long ones in "binarize" mode) are split into binary rules first,
+        # which keeps the expansion at most 4 alternatives per rule
+        nullable = self.nullable(rules)
+
+        def too_large(lhs, rhs):
+            return 2 ** sum(1 for symbol in rhs if symbol in nullable) > self.max_expansion
+
+        if self.epsilon_mode == "binarize":
+            rules = self.replace_long_productions(rules)
+            nullable = self.nullable(rules)
+        else:
+            oversized = [(lhs, rhs) for lhs, rhs in self._productions(rules) if too_large(lhs, rhs)]
+            if oversized:
+                lhs, rhs = oversized[0]
+                warnings.warn(
+                    f"epsilon elimination of {self.names[lhs]} -> {' '.join(self.names[s] for s in rhs)} "
+                    f"would produce more than {self.max_expansion} alternatives "
+                    f"({len(oversized)} productions affected), binarising them first",
+                    RuntimeWarning,
+                )
+                rules = self.replace_long_productions(rules, too_large)
+                nullable = self.nullable(rules)
+
+        result = {}
+        for lhs, rhs in self._productions(rules):
+            options = [(symbol, None) if symbol in nullable else (symbol,) for symbol in rhs]
+            for choice in product(*options):
+                expanded = tuple(symbol for symbol in choice if symbol is not None)
+                if expanded and expanded != (lhs,):
+                    self._add(result, lhs, expanded)
+        # the empty word survives only as S -> "" on a start symbol that no rhs mentions
+        for position, start in enumerate(self.starts):
+            if start in nullable:
+                if any(start in rhs for _, rhs in self._productions(result)):
+                    new_start = self._fresh(f"{self.names[start]}0")
+                    self._add(result, new_start, (start,))
+                    self.starts[position] = start = new_start
+                self._add(result, start, ())
+        return result
+
+    def eliminate_unit(self, rules):
+        terminals = self.terminals
+        graph = UnitProductionGraph(rules, lambda rhs: rhs[0] if len(rhs) == 1 and rhs[0] not in terminals else None)
+        self.unit_closure_sizes = {self.names[symbol]: size for symbol, size in graph.closure_sizes.items()}
+        return {lhs: dict.fromkeys(rhs_list) for lhs, rhs_list in graph.productions.items()}
+
+    def eliminate_nonproductive(self, rules):
+        productive = self.productive(rules) | self.terminals
+        return {
+            lhs: {rhs: None for rhs in alternatives if all(symbol in productive for symbol in rhs)}
+            for lhs, alternatives in rules.items()
+            if lhs in productive
+        }
+
+    def eliminate_inaccessible(self, rules):
+        reachable = self.reachable(rules)
+        return {lhs: alternatives for lhs, alternatives in rules.items() if lhs in reachable}
+
+    def replace_terminals(self, rules):
+        wrappers = {}
+        result = {}
+        for lhs, rhs in self._productions(rules):
+            if len(rhs) > 1:
+                rhs = tuple(self._wrap(terminal, wrappers, result) if terminal in self.terminals else terminal
+                            for terminal in rhs)
+            self._add(result, lhs, rhs)
+        return result
+
+    def _wrap(self, terminal, wrappers, result):
+        wrapper = wrappers.get(terminal)
+        if wrapper is None:
+            wrapper = wrappers[terminal] = self._fresh(f"T_{self.names[terminal]}")
+            self._add(result, wrapper, (terminal,))
+        return wrapper
+
+    def replace_long_productions(self, rules, selected=None):
+        # selected(lhs, rhs) limits the split to some productions (used by eliminate_epsilon)
+        suffixes = {}
+        result = {}
+        for lhs, rhs in self._productions(rules):
+            if selected is not None and not selected(lhs, rhs):
+                self._add(result, lhs, rhs)
+                continue
+            while len(rhs) > 2:
+                tail = rhs[1:]
+                new_state = suffixes.get(tail)
+                if new_state is not None:
+                    self._add(result, lhs, (rhs[0], new_state))
+                    break
+                new_state = suffixes[tail] = self._numbered("X")
+                self._add(result, lhs, (rhs[0], new_state))
+                lhs, rhs = new_state, tail
+            else:
+                self._add(result, lhs, rhs)
+        return result
+
+    def to_grammar(self, rules):
+        from .Grammar import Grammar
+
+        names = self.names
+        P = {}
+        non_terminals = set()
+        for lhs, alternatives in rules.items():
+            non_terminals.add(names[lhs])
+            out = P[names[lhs]] = []
+            for rhs in alternatives:
+                if not rhs:
+                    out.append("")
+                elif len(rhs) == 1:
+                    out.append(names[rhs[0]])
+                else:
+                    out.append([names[symbol] for symbol in rhs])
+                non_terminals.update(names[symbol] for symbol in rhs if symbol not in self.terminals)
+        return Grammar(non_terminals, set(self.source.V_t), P, {names[start] for start in self.starts})
+
+    def run(self, record_steps=False):
+        steps = [
+            ("Step 1: Remove Epsilon Productions", self.eliminate_epsilon),
+            ("Step 2: Remove Unit Productions", self.eliminate_unit),
+            ("Step 3: Remove Non-Productive Symbols", self.eliminate_nonproductive),
+            ("Step 4: Remove Inaccessible Symbols", self.eliminate_inaccessible),
+            ("Step 5: Replace Terminals", self.replace_terminals),
+            ("Result: Bring to Chomsky Normal Form (CNF)", self.replace_long_productions),
+        ]
+        rules = self.rules
+        self.starts = list(self.initial_starts)
+        self.steps = {}
+        if record_steps:
+            self.steps["Original Grammar:"] = str(self.source)
+        for title, step in steps:
+            rules = step(rules)
+            if record_steps:
+                self.steps[title] = str(self.to_grammar(rules))
+        return self.to_grammar(rules)
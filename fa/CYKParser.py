@@ -0,0 +1,111 @@
+class CYKParser:
+    # CYK recognizer for a grammar in Chomsky normal form (the output of Grammar.normalize_cnf).
+    # Non-terminals are numbered and every table cell is a bitmask of the non-terminals deriving
+    # that span; binary rules are indexed by their left child, then by the right child.
+    def __init__(self, grammar):
+        self.non_terminals = sorted(grammar.V_n)
+        self.index = {symbol: i for i, symbol in enumerate(self.non_terminals)}
+        self.start_mask = 0
+        for symbol in grammar.S:
+            if symbol in self.index:
+                self.start_mask |= 1 << self.index[symbol]
+        self.accepts_empty = False
+        self.terminal_rules = {}  # terminal -> mask of A with A -> terminal
+        self.right_masks = [0] * len(self.non_terminals)  # B -> mask of C with some A -> B C
+        self.binary_rules = [{} for _ in self.non_terminals]  # B -> {C: mask of A with A -> B C}
+
+        for lhs, rhs_list in grammar.P.items():
+            for rhs in rhs_list:
+                symbols = grammar.split_rhs(rhs)
+                if lhs not in self.index:
+                    raise ValueError(f"production {lhs} -> {rhs} is not in Chomsky normal form")
+                bit = 1 << self.index[lhs]
+                if not symbols and lhs in grammar.S:
+                    self.accepts_empty = True
+                elif len(symbols) == 1 and symbols[0] in grammar.V_t:
+                    self.terminal_rules[symbols[0]] = self.terminal_rules.get(symbols[0], 0) | bit
+                elif len(symbols) == 2 and all(symbol in self.index for symbol in symbols):
+                    left, right = self.index[symbols[0]], self.index[symbols[1]]
+                    self.right_masks[left] |= 1 << right
+                    rules = self.binary_rules[left]
+                    rules[right] = rules.get(right, 0) | bit
+                else:
+                    raise ValueError(f"production {lhs} -> {rhs} is not in Chomsky normal form")
+
+    @staticmethod
+    def _bits(mask):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def _combine(self, left, right):
+        result = 0
+        for b in self._bits(left):
+            candidates = self.right_masks[b] & right
+            if candidates:
+                rules = self.binary_rules[b]
+                for c in self._bits(candidates):
+                    result |= rules[c]
+        return result
+
+    def table(self, word):
+        # spans[i] = {j: mask} for the non-empty cells covering word[i:j]
+        n = len(word)
+        spans = [{} for _ in range(n + 1)]
+        for i, terminal in enumerate(word):
+            mask = self.terminal_rules.get(terminal, 0)
+            if not mask:
+                return None
+            spans[i][i + 1] = mask
+
+        for length in range(2, n + 1):
+            for i in range(n - length + 1):
+                j = i + length
+                cell = 0
+                for k, left in spans[i].items():
+                    right = spans[k].get(j)
+                    if right:
+                        cell |= self._combine(left, right)
+                if cell:
+                    spans[i][j] = cell
+        return spans
+
+    def accepts(self, word):
+        if not word:
+            return self.accepts_empty
+        spans = self.table(word)
+        return spans is not None and bool(spans[0].get(len(word), 0) & self.start_mask)
+
+    def parse_forest(self, word):
+        # packed forest of the derivations: {(A, i, j): [(terminal,) or ((B, i, k), (C, k, j)), ...]},
+        # rebuilt top-down from the recognition table, only nodes reachable from the start are kept
+        spans = self.table(word) if word else None
+        n = len(word)
+        if not spans or not spans[0].get(n, 0) & self.start_mask:
+            return None
+
+        forest = {}
+        names = self.non_terminals
+        stack = [(a, 0, n) for a in self._bits(spans[0][n] & self.start_mask)]
+        roots = [(names[a], 0, n) for a, _, _ in stack]
+        while stack:
+            a, i, j = stack.pop()
+            node = (names[a], i, j)
+            if node in forest:
+                continue
+            alternatives = forest[node] = []
+            if j == i + 1 and self.terminal_rules.get(word[i], 0) >> a & 1:
+                alternatives.append((word[i],))
+            for k, left in spans[i].items():
+                right = spans[k].get(j) if k < j else None
+                if not right:
+                    continue
+                for b in self._bits(left):
+                    rules = self.binary_rules[b]
+                    for c in self._bits(self.right_masks[b] & right):
+                        if rules[c] >> a & 1:
+                            alternatives.append(((names[b], i, k), (names[c], k, j)))
+                            stack.append((b, i, k))
+                            stack.append((c, k, j))
+        return roots, forest
@@ -0,0 +1,397 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from .BitsetNFA import BitsetNFA
+from .PartitionRefinement import PartitionRefinement
+from .SymbolTable import SymbolTable
+
+
+# save()/load() file layout (little-endian):
+#   header   magic, num_states, width, start, dead, symbol table size
+#   symbols  JSON list, zero-padded to a multiple of 8 bytes
+#   table    num_states * width int32
+#   accept   bitmap, bit i of byte i // 8 set for accepting state i
+MAGIC = b"LFADFA1\0"
+HEADER = struct.Struct("<8sIIiiI")
+_EXPAND_BITS = [bytes((value >> bit) & 1 for bit in range(8)) for value in range(256)]
+
+
+class CompiledDFA:
+    # flat integer transition table: table[state * width + symbol_id] = next state,
+    # missing transitions go to an absorbing dead state (dead = -1 if the DFA is complete)
+    def __init__(self, labels, symbols, table, start, accepting, dead=-1):
+        self.labels = labels
+        self.symbols = symbols
+        self.symbol_table = SymbolTable(symbols)  # splits strings over multi-character symbols
+        self.symbol_index = self.symbol_table.index
+        self.width = len(symbols)
+        self.table = table
+        self.start = start
+        self.accepting = accepting
+        self.dead = dead
+        self._batch_tables = None
+
+    @property
+    def num_states(self):
+        return len(self.labels)
+
+    @classmethod
+    def from_indexed(cls, indexed):
+        if indexed.is_deterministic():
+            labels = list(indexed.states)
+            rows = [{symbol: ids[0] for symbol, ids in row.items() if ids} for row in indexed.delta]
+            start = indexed.starts[0] if indexed.starts else None
+            accepting = list(indexed.accepting)
+        else:
+            nfa = BitsetNFA.from_indexed(indexed)
+            masks, rows = nfa.determinize()
+            labels = [frozenset(nfa.active_states(mask)) for mask in masks]
+            accepting = [bool(mask & nfa.accept_mask) for mask in masks]
+            start = 0 if nfa.start_mask else None
+
+        width = len(indexed.symbols)
+        dead = -1
+        if start is None or any(len(row) < width for row in rows):
+            dead = len(labels)
+            labels.append(frozenset())
+            rows.append({})
+            accepting.append(False)
+            if start is None:
+                start = dead
+
+        table = array('i', [dead]) * (len(rows) * width)
+        for state, row in enumerate(rows):
+            base = state * width
+            for symbol, target in row.items():
+                table[base + symbol] = target
+        if dead >= 0:
+            for symbol in range(width):
+                table[dead * width + symbol] = dead
+
+        return cls(labels, list(indexed.symbols), table, start, bytearray(accepting), dead)
+
+    def matches(self, input_string):
+        if isinstance(input_string, str) and self.symbol_table.max_length > 1:
+            input_string = self.symbol_table.split(input_string)
+        table = self.table
+        width = self.width
+        symbol_index = self.symbol_index
+        dead = self.dead
+        state = self.start
+        for char in input_string:
+            symbol = symbol_index.get(char)
+            if symbol is None:
+                return False
+            state = table[state * width + symbol]
+            if state == dead:
+                return False
+        return bool(self.accepting[state])
+
+    def reachable_states(self):
+        table = self.table
+        width = self.width
+        seen = bytearray(self.num_states)
+        seen[self.start] = 1
+        order = [self.start]
+        for state in order:
+            base = state * width
+            for target in table[base:base + width]:
+                if not seen[target]:
+                    seen[target] = 1
+                    order.append(target)
+        return order
+
+    def minimize(self):
+        # Hopcroft partition refinement on the (complete, dead-state) table after pruning unreachable states
+        width = self.width
+        table = self.table
+        reachable = self.reachable_states()
+        local = {state: i for i, state in enumerate(reachable)}
+        n = len(reachable)
+
+        predecessors = [[[] for _ in range(n)] for _ in range(width)]
+        for i, state in enumerate(reachable):
+            base = state * width
+            for symbol in range(width):
+                predecessors[symbol][local[table[base + symbol]]].append(i)
+
+        accepting = [i for i, state in enumerate(reachable) if self.accepting[state]]
+        rejecting = [i for i, state in enumerate(reachable) if not self.accepting[state]]
+        partition = PartitionRefinement(n, [accepting, rejecting])
+        waiting = {min(range(len(partition)), key=partition.size)} if len(partition) > 1 else set()
+
+        while waiting:
+            splitter = partition.members(waiting.pop())
+            for symbol in range(width):
+                preimage = predecessors[symbol]
+                for state in splitter:
+                    for source in preimage[state]:
+                        partition.mark(source)
+                for block, new_block in partition.split():
+                    if block in waiting or partition.size(new_block) <= partition.size(block):
+                        waiting.add(new_block)
+                    else:
+                        waiting.add(block)
+
+        # renumber blocks in BFS order from the start block
+        block_of = partition.block_of
+        start_block = block_of[0]
+        new_id = {start_block: 0}
+        order = [start_block]
+        rows = []
+        for block in order:
+            representative = reachable[partition.members(block)[0]]
+            base = representative * width
+            row = []
+            for symbol in range(width):
+                target = block_of[local[table[base + symbol]]]
+                if target not in new_id:
+                    new_id[target] = len(order)
+                    order.append(target)
+                row.append(new_id[target])
+            rows.append(row)
+
+        new_table = array('i', [target for row in rows for target in row])
+        new_accepting = bytearray(self.accepting[reachable[partition.members(block)[0]]] for block in order)
+        labels = [frozenset(self.labels[reachable[i]] for i in partition.members(block)) for block in order]
+        dead = -1
+        for state, row in enumerate(rows):
+            if not new_accepting[state] and all(target == state for target in row):
+                dead = state
+                break
+        return CompiledDFA(labels, list(self.symbols), new_table, 0, new_accepting, dead)
+
+    def to_finite_automaton(self):
+        # same shape as nfa_to_dfa output: states are sets of the original state names
+        from .FiniteAutomaton import FiniteAutomaton
+
+        def flatten(label):
+            if isinstance(label, frozenset):
+                names = set()
+                for member in label:
+                    names |= flatten(member)
+                return names
+            return {label}
+
+        live = [state for state in self.reachable_states() if state != self.dead]
+        states = {state: flatten(self.labels[state]) for state in live}
+        readable = all(isinstance(name, str) for names in states.values() for name in names)
+        if not readable or len({frozenset(names) for names in states.values()}) < len(states):
+            states = {state: {f"q{i}"} for i, state in enumerate(live)}
+
+        transitions = {}
+        for state in live:
+            base = state * self.width
+            row = {
+                self.symbols[symbol]: states[target]
+                for symbol, target in enumerate(self.table[base:base + self.width])
+                if target != self.dead
+            }
+            if row:
+                transitions[frozenset(states[state])] = row
+
+        start = states[self.start].copy() if self.start != self.dead else set()
+        accept_states = [states[state] for state in live if self.accepting[state]]
+        return FiniteAutomaton(list(states.values()), set(self.symbols), transitions, start, accept_states)
+
+    def _get_batch_tables(self):
+        # numpy view of the table with two extra columns: unknown symbol -> dead, padding -> same state
+        if self._batch_tables is None:
+            import numpy as np
+
+            num_states = self.num_states
+            dead = self.dead if self.dead >= 0 else num_states
+            table = np.empty((max(num_states, dead + 1), self.width + 2), dtype=np.int32)
+            table[:num_states, :self.width] = np.frombuffer(self.table, dtype=np.int32).reshape(num_states, self.width)
+            table[dead, :self.width] = dead
+            table[:, self.width] = dead
+            table[:, self.width + 1] = np.arange(table.shape[0], dtype=np.int32)
+
+            accepting = np.zeros(table.shape[0], dtype=bool)
+            accepting[:num_states] = np.frombuffer(bytes(self.accepting), dtype=np.uint8).astype(bool)
+
+            single_chars = [(ord(symbol), i) for i, symbol in enumerate(self.symbols) if isinstance(symbol, str) and len(symbol) == 1]
+            lookup = np.full(max((code for code, _ in single_chars), default=0) + 2, self.width, dtype=np.int32)
+            for code, i in single_chars:
+                lookup[code] = i
+            self._batch_tables = table, accepting, lookup
+        return self._batch_tables
+
+    def encode_batch(self, strings):
+        # (max length, len(strings)) matrix of symbol columns, one row per input position;
+        # shorter strings are padded with a column that keeps the current state
+        import numpy as np
+
+        _, _, lookup = self._get_batch_tables()
+        strings = list(strings)
+        if self.symbol_table.max_length > 1 or not all(isinstance(s, str) for s in strings):
+            return self._encode_symbol_batch(strings)
+        lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+        max_length = int(lengths.max()) if len(strings) else 0
+        codes = np.full((max_length, len(strings)), self.width + 1, dtype=np.int32)
+        if lengths.sum():
+            chars = np.frombuffer("".join(strings).encode("utf-32-le"), dtype=np.uint32)
+            chars = np.minimum(chars, len(lookup) - 1)
+            starts = np.cumsum(lengths) - lengths
+            positions = np.arange(len(chars)) - np.repeat(starts, lengths)
+            codes.ravel()[positions * len(strings) + np.repeat(np.arange(len(strings)), lengths)] = lookup[chars]
+        return codes
+
+    def _encode_symbol_batch(self, strings):
+        # encode_batch for multi-character symbols or symbol lists: every string is split into
+        # symbols first, unknown symbols get the dead column
+        import numpy as np
+
+        table = self.symbol_table
+        rows = [
+            table.encode(table.split(s) if isinstance(s, str) else s, intern=False)
+            for s in strings
+        ]
+        codes = np.full((max(map(len, rows), default=0), len(rows)), self.width + 1, dtype=np.int32)
+        for column, row in enumerate(rows):
+            if row:
+                symbols = np.array(row, dtype=np.int32)
+                symbols[symbols < 0] = self.width
+                codes[:len(row), column] = symbols
+        return codes
+
+    def matches_many(self, strings):
+        # steps the whole batch through the table with one vectorized gather per input position
+        import numpy as np
+
+        table, accepting, _ = self._get_batch_tables()
+        flat = table.ravel()
+        stride = table.shape[1]
+        codes = self.encode_batch(strings)
+        states = np.full(codes.shape[1], self.start, dtype=np.int32)
+        for column in codes:
+            states = flat[states * stride + column]
+        return accepting[states]
+
+    def _count_dtype(self, length):
+        # every row of a complete DFA has width entries, so no count exceeds width ** length;
+        # past int64 the counts fall back to exact Python ints in an object array
+        import numpy as np
+
+        return np.int64 if self.width ** length < 2 ** 63 else object
+
+    def count_words(self, max_length):
+        # counts[n] = number of accepted words of length n for n = 0..max_length; a vector of
+        # path counts per state is pushed through the table once per length
+        import numpy as np
+
+        dtype = self._count_dtype(max_length)
+        targets = np.frombuffer(self.table, dtype=np.int32)
+        accepting = np.frombuffer(bytes(self.accepting), dtype=np.uint8).astype(bool)
+        paths = np.zeros(self.num_states, dtype=dtype)
+        paths[self.start] = 1
+        counts = []
+        for length in range(max_length + 1):
+            counts.append(int(paths[accepting].sum()))
+            if length < max_length:
+                following = np.zeros(self.num_states, dtype=dtype)
+                np.add.at(following, targets, np.repeat(paths, self.width))
+                paths = following
+        return counts
+
+    def count_words_of_length(self, length):
+        # single length via repeated squaring of the state adjacency matrix, O(states^3 log length)
+        import numpy as np
+
+        dtype = self._count_dtype(length)
+        num_states = self.num_states
+        adjacency = np.zeros((num_states, num_states), dtype=dtype)
+        sources = np.repeat(np.arange(num_states), self.width)
+        np.add.at(adjacency, (sources, np.frombuffer(self.table, dtype=np.int32)), 1)
+        accepting = np.frombuffer(bytes(self.accepting), dtype=np.uint8).astype(bool)
+        return int(np.linalg.matrix_power(adjacency, length)[self.start][accepting].sum())
+
+    def enumerate_words(self, max_length):
+        # accepted words in shortlex order (by length, then by symbol order), generated lazily;
+        # live[r][state] says whether some word of exactly r more symbols is accepted from state,
+        # so the depth-first walk only keeps the current path and never enters an empty branch
+        import numpy as np
+
+        num_states = self.num_states
+        targets = np.frombuffer(self.table, dtype=np.int32).reshape(num_states, self.width)
+        current = np.frombuffer(bytes(self.accepting), dtype=np.uint8).astype(bool)
+        live = [current.tobytes()]
+        for _ in range(max_length):
+            current = current[targets].any(axis=1)
+            live.append(current.tobytes())
+
+        order = sorted(range(self.width), key=lambda symbol: str(self.symbols[symbol]))
+        edges = [
+            [(self.symbols[symbol], self.table[state * self.width + symbol]) for symbol in order]
+            for state in range(num_states)
+        ]
+        for length in range(max_length + 1):
+            if not live[length][self.start]:
+                continue
+            if length == 0:
+                yield ""
+                continue
+            word = []
+            stack = [iter(edges[self.start])]
+            while stack:
+                remaining = length - len(stack)
+                for symbol, target in stack[-1]:
+                    if live[remaining][target]:
+                        break
+                else:
+                    stack.pop()
+                    if word:
+                        word.pop()
+                    continue
+                word.append(symbol)
+                if remaining:
+                    stack.append(iter(edges[target]))
+                else:
+                    yield "".join(word)
+                    word.pop()
+
+    def save(self, path):
+        # state labels are not stored, a loaded DFA numbers its states 0..n-1
+        symbols = json.dumps(self.symbols).encode("utf-8")
+        symbols += b"\0" * (-len(symbols) % 8)
+        table = array('i', self.table)
+        if sys.byteorder != "little":
+            table.byteswap()
+        bitmap = bytearray((self.num_states + 7) // 8)
+        for state in range(self.num_states):
+            if self.accepting[state]:
+                bitmap[state >> 3] |= 1 << (state & 7)
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, self.num_states, self.width, self.start, self.dead, len(symbols)))
+            file.write(symbols)
+            file.write(table.tobytes())
+            file.write(bitmap)
+
+    @classmethod
+    def load(cls, path):
+        # the table stays in a read-only shared mmap, so worker processes loading the same file share its pages
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, num_states, width, start, dead, symbols_size = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a saved automaton")
+
+        offset = HEADER.size
+        symbols = json.loads(bytes(buffer[offset:offset + symbols_size]).rstrip(b"\0"))
+        offset += symbols_size
+        table_size = num_states * width * 4
+        table = memoryview(buffer)[offset:offset + table_size].cast('i')
+        if sys.byteorder != "little":
+            table = array('i', table)
+            table.byteswap()
+        offset += table_size
+        bitmap = buffer[offset:offset + (num_states + 7) // 8]
+        accepting = bytearray(b"".join(_EXPAND_BITS[value] for value in bitmap)[:num_states])
+        return cls(list(range(num_states)), symbols, table, start, accepting, dead)
+
+    def __repr__(self):
+        return f"CompiledDFA(states={self.num_states}, symbols={self.symbols}, start={self.start})"
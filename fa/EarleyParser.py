@@ -0,0 +1,126 @@
+class EarleyParser:
+    # Earley recognizer for any context-free grammar (no CNF needed). Items are (rule, dot, origin)
+    # tuples; every Earley set keeps an index of the items waiting on each non-terminal so completion
+    # only visits the items it can advance. Nullable non-terminals are skipped over at prediction
+    # time (Aycock & Horspool), so empty productions need no special completion pass.
+    def __init__(self, grammar):
+        self.non_terminals = set(grammar.V_n)
+        self.starts = [symbol for symbol in grammar.S if symbol in self.non_terminals]
+        self.rules = []  # (lhs, tuple of rhs symbols)
+        self.rules_for = {}
+        for lhs, rhs_list in grammar.P.items():
+            for rhs in rhs_list:
+                self.rules_for.setdefault(lhs, []).append(len(self.rules))
+                self.rules.append((lhs, tuple(grammar.split_rhs(rhs))))
+        self.nullable = self._nullable()
+
+    def _nullable(self):
+        nullable = set()
+        users = {}
+        remaining = []
+        queue = []
+        for rule, (lhs, rhs) in enumerate(self.rules):
+            remaining.append(len(rhs))
+            for symbol in set(rhs):
+                users.setdefault(symbol, []).append(rule)
+            if not rhs:
+                queue.append(lhs)
+        while queue:
+            symbol = queue.pop()
+            if symbol in nullable:
+                continue
+            nullable.add(symbol)
+            for rule in users.get(symbol, ()):
+                remaining[rule] -= self.rules[rule][1].count(symbol)
+                if remaining[rule] == 0:
+                    queue.append(self.rules[rule][0])
+        return nullable
+
+    def initial_chart(self):
+        # the chart is a pair of parallel lists: Earley sets (item set, agenda) and per-set
+        # indexes {next symbol: waiting items}; scan() pushes one position, pop() removes it
+        sets = [(set(), [])]
+        waiting = [{}]
+        for start in self.starts:
+            for rule in self.rules_for.get(start, ()):
+                self._add(sets[0], (rule, 0, 0))
+        self._close(sets, waiting, 0)
+        return sets, waiting
+
+    @staticmethod
+    def _add(earley_set, item):
+        items, agenda = earley_set
+        if item not in items:
+            items.add(item)
+            agenda.append(item)
+
+    def _close(self, sets, waiting, position):
+        # predict and complete until the agenda of this set is exhausted
+        rules = self.rules
+        non_terminals = self.non_terminals
+        nullable = self.nullable
+        earley_set = sets[position]
+        agenda = earley_set[1]
+        waits = waiting[position]
+        add = self._add
+        index = 0
+        while index < len(agenda):
+            rule, dot, origin = agenda[index]
+            index += 1
+            rhs = rules[rule][1]
+            if dot == len(rhs):
+                # complete: advance the items of the origin set that wait on this lhs
+                lhs = rules[rule][0]
+                for waiting_rule, waiting_dot, waiting_origin in waiting[origin].get(lhs, ()):
+                    add(earley_set, (waiting_rule, waiting_dot + 1, waiting_origin))
+                continue
+            symbol = rhs[dot]
+            entries = waits.get(symbol)
+            if entries is None:
+                entries = waits[symbol] = []
+                if symbol in non_terminals:
+                    for predicted in self.rules_for.get(symbol, ()):
+                        add(earley_set, (predicted, 0, position))
+            entries.append((rule, dot, origin))
+            if symbol in nullable:
+                add(earley_set, (rule, dot + 1, origin))
+
+    def scan(self, chart, terminal):
+        # consumes one terminal; returns False (and leaves the chart unchanged) if no item can take it
+        sets, waiting = chart
+        position = len(sets) - 1
+        entries = waiting[position].get(terminal)
+        if not entries or terminal in self.non_terminals:
+            return False
+        earley_set = (set(), [])
+        for rule, dot, origin in entries:
+            self._add(earley_set, (rule, dot + 1, origin))
+        sets.append(earley_set)
+        waiting.append({})
+        self._close(sets, waiting, position + 1)
+        return True
+
+    @staticmethod
+    def pop(chart):
+        sets, waiting = chart
+        sets.pop()
+        waiting.pop()
+
+    def is_complete(self, chart):
+        sets, _ = chart
+        for rule, dot, origin in sets[-1][0]:
+            lhs, rhs = self.rules[rule]
+            if origin == 0 and dot == len(rhs) and lhs in self.starts:
+                return True
+        return False
+
+    def chart(self, word):
+        chart = self.initial_chart()
+        for terminal in word:
+            if not self.scan(chart, terminal):
+                break
+        return chart
+
+    def accepts(self, word):
+        chart = self.chart(word)
+        return len(chart[0]) == len(word) + 1 and self.is_complete(chart)
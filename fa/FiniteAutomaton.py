@@ -1,12 +1,61 @@
+from . import Product, RegularConversion
+from .BitsetNFA import BitsetNFA
+from .CompiledDFA import CompiledDFA
+from .IndexedAutomaton import EPSILON, IndexedAutomaton, freeze_state
+from .LazyDFA import LazyDFA
+from .ResultCache import canonical_digest
+from .StreamMatcher import StreamMatcher
+from .SymbolTable import SymbolTable
+
+
 class FiniteAutomaton:
     def __init__(self, states, alphabet, transitions, start_state, accept_states):
         self.states = states
         self.alphabet = alphabet
-        self.transitions = transitions  # dict {frozenset: dict{symbol: set(next states)}
+        self.transitions = transitions  # dict {frozenset: dict{symbol: set(next states)}, symbol "" is an epsilon move
         self.start_state = start_state
         self.accept_states = accept_states
+        self._derived = {}
+        self._derived_from = None
+
+    def invalidate(self):
+        # drops the cached indexed / bitset / compiled forms; needed after editing states, alphabet,
+        # transitions or accept states in place (assigning a new container is noticed on its own)
+        self._derived = {}
+        self._derived_from = None
+
+    def _cached(self, name, build):
+        # forms derived from the automaton are built once and reused by every later query
+        parts = (self.states, self.alphabet, self.transitions, self.start_state, self.accept_states)
+        if self._derived_from is None or any(part is not old for part, old in zip(parts, self._derived_from)):
+            self._derived = {}
+            self._derived_from = parts
+        if name not in self._derived:
+            self._derived[name] = build()
+        return self._derived[name]
+
+    def _indexed(self):
+        return self._cached("indexed", lambda: IndexedAutomaton.from_automaton(self))
+
+    def _matcher(self):
+        return self._cached("matcher", lambda: self.compile() if self._indexed().is_deterministic() else self.bitset_nfa())
+
+    def __getstate__(self):
+        # pickles carry the automaton only, the cached forms are rebuilt on demand
+        state = dict(self.__dict__)
+        state["_derived"] = {}
+        state["_derived_from"] = None
+        return state
 
     def string_belongs_to_language(self, input_string):
+        input_string = self.split_word(input_string)
+        if self._cached("has_epsilon", self.has_epsilon_transitions) or isinstance(self.start_state, (set, frozenset, list)):
+            # the closures are computed once, with the cached bitset_nfa(). Automata with set-valued
+            # states (nfa_to_dfa, minimize, products) go the same way: the indexed view reads such a
+            # set as one composite state instead of hashing it, and as those are deterministic they
+            # are matched on the cached compile() table
+            return self._matcher().matches(input_string)
+
         current_states = {self.start_state}
 
         for char in input_string:
@@ -24,74 +73,141 @@ class FiniteAutomaton:
 
         return bool(current_states.intersection(self.accept_states))
 
+    def symbol_table(self):
+        # same numbering as the compiled forms: symbols sorted by name, epsilon excluded
+        return self._cached("symbol_table", lambda: SymbolTable(sorted(set(self.alphabet) - {EPSILON}, key=str)))
+
+    def split_word(self, word):
+        # over multi-character symbols (e.g. the T_a, X0 of a CNF grammar) a string is read by
+        # longest match, "T_aX0" -> ["T_a", "X0"]; symbol lists pass through unchanged. The
+        # compiled, batch, bitset and stream matchers split the same way
+        if isinstance(word, str) and self.symbol_table().max_length > 1:
+            return self.symbol_table().split(word)
+        return word
+
+    def has_epsilon_transitions(self):
+        return any(EPSILON in transitions for transitions in self.transitions.values())
+
+    def compile(self):
+        # number states/symbols and build a flat transition table (determinising first if needed);
+        # built once, later calls return the same table
+        return self._cached("compiled", lambda: CompiledDFA.from_indexed(self._indexed()))
+
+    def bitset_nfa(self):
+        # NFA simulation without determinisation, for automata where nfa_to_dfa would blow up; cached like compile()
+        return self._cached("bitset_nfa", lambda: BitsetNFA.from_indexed(self._indexed()))
+
+    def lazy_dfa(self, max_states=10000):
+        # determinises on demand while matching, keeping at most max_states subset states cached
+        return LazyDFA(self.bitset_nfa(), max_states)
+
+    def stream_matcher(self):
+        # feed(chunk) / result() over str, bytes or memoryview chunks in constant memory
+        return StreamMatcher(self.compile())
+
+    def save(self, path):
+        # stores the compiled table: CompiledDFA.load(path) maps it back, to_finite_automaton() gives the dict form
+        self.compile().save(path)
+
+    def matches_many(self, strings):
+        # numpy boolean array, one entry per input string
+        return self.compile().matches_many(strings)
+
+    def count_words(self, max_length):
+        # number of accepted words of each length 0..max_length
+        return self.compile().count_words(max_length)
+
+    def enumerate_words(self, max_length):
+        # generator over the accepted words up to max_length in shortlex order
+        return self.compile().enumerate_words(max_length)
+
     def to_grammar(self):
-        from Grammar import Grammar
-        V_n = self.states
-        V_t = self.alphabet
-        P = {}
-
-        for state, transitions in self.transitions.items():
-            for symbol, next_states in transitions.items():
-                for next_state in next_states:
-                    if state not in P:
-                        P[state] = []
-                    if next_state in self.accept_states:
-                        P[state].append(symbol)  # A -> a
-                    else:
-                        P[state].append(f"{symbol}{next_state}")  # A -> aB
-
-        S = self.start_state
-        return Grammar(V_n, V_t, P, S)
+        # right-linear grammar of the same language (A -> a, A -> aB, S -> "" if the empty word is accepted)
+        return RegularConversion.automaton_to_grammar(self)
 
     def is_nfa(self):
-        for transitions in self.transitions.values():
-            for next_states in transitions.values():
-                if len(next_states) > 1 and next_states not in self.states:
-                    return True
-        return False
+        return not self._indexed().is_deterministic()
+
+    def canonical_hash(self):
+        # independent of the order of states, transitions and target sets; cached like compile()
+        return self._cached("canonical_hash", self._canonical_hash)
+
+    def _canonical_hash(self):
+        def name(state):
+            state = freeze_state(state)
+            if isinstance(state, frozenset):
+                return "{" + "\x1e".join(sorted(map(str, state))) + "}"
+            return str(state)
+
+        transitions = [
+            f"{name(state)}\x1f{symbol}\x1f{name(target)}"
+            for state, row in self.transitions.items()
+            for symbol, next_states in row.items()
+            for target in (next_states if isinstance(next_states, (set, frozenset, list)) else [next_states])
+        ]
+        return canonical_digest(
+            map(name, self.states), map(str, self.alphabet), transitions, [name(self.start_state)], map(name, self.accept_states)
+        )
 
-    def nfa_to_dfa(self):
+    def nfa_to_dfa(self, compiled=False, cache=None):
+        # compiled=True returns the CompiledDFA table instead of a FiniteAutomaton of state sets;
+        # with a ResultCache an automaton determinised before costs one hash and one lookup and
+        # returns the cached, shared result
+        if cache is not None:
+            kind = "nfa_to_dfa_compiled" if compiled else "nfa_to_dfa"
+            return cache.get_or_compute(kind, self.canonical_hash(), lambda: self.nfa_to_dfa(compiled))
 
-        if not self.is_nfa():
+        if compiled:
+            return self.compile()
 
+        if self._indexed().is_deterministic():
             return self
 
-        dfa_states = []
+        nfa = self.bitset_nfa()
+        masks, rows = nfa.determinize()
+        dfa_states = [nfa.active_states(mask) for mask in masks]
         dfa_transitions = {}
-        unprocessed_states = [self.start_state.copy()]
-        processed_states = set()
-
-        while unprocessed_states:
-            current_state = unprocessed_states.pop(0)
-            processed_states.add(frozenset(current_state))
-            dfa_states.append(current_state)
-
-            for symbol in self.alphabet:
-                next_state = set()
-                for s in current_state:
-                    if s in self.transitions and symbol in self.transitions[s]:
-                        next_state.update(self.transitions[s][symbol])
-
-                if next_state:
-                    next_state_frozen = frozenset(next_state)
-                    if next_state_frozen not in processed_states and next_state not in unprocessed_states:
-                        unprocessed_states.append(next_state.copy())
-
-                    dfa_transitions[frozenset(current_state)] = dfa_transitions.get(frozenset(current_state), {})
-                    dfa_transitions[frozenset(current_state)][symbol] = next_state.copy()
-
-        dfa_accept_states = [
-            state for state in dfa_states if any(s in self.accept_states for s in state)
-        ]
+        for subset, row in enumerate(rows):
+            if row:
+                dfa_transitions[frozenset(dfa_states[subset])] = {
+                    nfa.symbols[symbol]: dfa_states[target] for symbol, target in row.items()
+                }
+        dfa_accept_states = [dfa_states[subset] for subset, mask in enumerate(masks) if mask & nfa.accept_mask]
 
         return FiniteAutomaton(
             dfa_states,
             self.alphabet,
-            {frozenset(k): v for k, v in dfa_transitions.items()},
-            self.start_state,
+            dfa_transitions,
+            dfa_states[0].copy(),
             dfa_accept_states
         )
 
+    def minimize(self, compiled=False):
+        # minimal complete DFA (Hopcroft); the dead state is dropped again in the FiniteAutomaton form
+        dfa = self.nfa_to_dfa(compiled=True).minimize()
+        return dfa if compiled else dfa.to_finite_automaton()
+
+    @staticmethod
+    def _as_compiled(automaton):
+        return automaton if isinstance(automaton, CompiledDFA) else automaton.compile()
+
+    def _product(self, other, operation, compiled):
+        dfa = Product.product(self.compile(), self._as_compiled(other), operation)
+        return dfa if compiled else dfa.to_finite_automaton()
+
+    def intersection(self, other, compiled=False):
+        return self._product(other, "intersection", compiled)
+
+    def union(self, other, compiled=False):
+        return self._product(other, "union", compiled)
+
+    def difference(self, other, compiled=False):
+        return self._product(other, "difference", compiled)
+
+    def equivalent(self, other):
+        # (True, None) or (False, shortest word accepted by exactly one of the two automata)
+        return Product.equivalent(self.compile(), self._as_compiled(other))
+
     def draw_graph(self, name):
         from graphviz import Digraph
         import os
@@ -1,12 +1,90 @@
 import random
+import warnings
 from itertools import product
 
+from . import RegularConversion
+from .CNFPipeline import CNFPipeline
+from .CYKParser import CYKParser
+from .EarleyParser import EarleyParser
+from .GrammarSampler import GrammarSampler
+from .GrammarTypeIndex import GrammarTypeIndex
+from .ResultCache import canonical_digest
+from .SymbolTable import SymbolTable
+from .UnitProductions import UnitProductionGraph
+
+
 class Grammar:
+    MAX_EPSILON_EXPANSION = 1024
+    NORMALIZE_CNF_VERSION = 3
+
     def __init__(self, V_n, V_t, P, S):
         self.V_n = V_n
         self.V_t = V_t
         self.P = P
-        self.S = set(S)
+        self.S = {S} if isinstance(S, str) else set(S)  # a single start may be given by name
+        self._symbol_table = None
+        self._symbol_table_key = None
+        self.num_terminals = 0
+        self._type_index = None
+        self._type_index_key = None
+        self._canonical_hash = None
+        self._canonical_hash_key = None
+
+    def invalidate(self):
+        # call after editing V_n, V_t, P or S directly: drops the symbol table, the type index and
+        # the canonical hash, all rebuilt on next use. add_production / remove_production keep them
+        # current, and assigning a new V_n, V_t, P or S is noticed without this call
+        self._symbol_table = None
+        self._type_index = None
+        self._canonical_hash = None
+
+    @staticmethod
+    def _same(parts, key):
+        return key is not None and all(part is old for part, old in zip(parts, key))
+
+    def symbol_table(self):
+        # terminals get ids 0..num_terminals-1, non-terminals the ids after them
+        key = (self.V_t, self.V_n)
+        if self._symbol_table is None or not self._same(key, self._symbol_table_key):
+            self._symbol_table = SymbolTable(sorted(self.V_t, key=str))
+            self.num_terminals = len(self._symbol_table)
+            for symbol in sorted(self.V_n, key=str):
+                self._symbol_table.intern(symbol)
+            self._symbol_table_key = key
+            self._type_index = None
+        return self._symbol_table
+
+    def split_rhs(self, rhs):
+        # normalize_cnf leaves both strings ("aX") and symbol lists (["T_a", "X"]) in P;
+        # strings are cut into the longest known symbols, so "aT_bX0" is ["a", "T_b", "X0"]
+        if isinstance(rhs, (list, tuple)):
+            return list(rhs)
+        return self.symbol_table().split(rhs)
+
+    def encoder(self):
+        # function mapping a production side to its int tuple over symbol_table(),
+        # -1 for symbols outside V_n and V_t; the table is looked up once per encoder
+        table = self.symbol_table()
+        index = table.index
+        split = table.split
+
+        def encode(rhs):
+            symbols = rhs if isinstance(rhs, (list, tuple)) else split(rhs)
+            return tuple([index.get(symbol, -1) for symbol in symbols])
+
+        return encode
+
+    def encode(self, rhs):
+        return self.encoder()(rhs)
+
+    def productions(self):
+        # every production as a (lhs ids, rhs ids) pair of int tuples
+        encode = self.encoder()
+        result = []
+        for lhs, rhs_list in self.P.items():
+            lhs = encode(lhs)
+            result.extend((lhs, encode(rhs)) for rhs in rhs_list)
+        return result
 
     def generate_string(self, max_length=10):
         current_string = self.S
@@ -30,106 +108,156 @@ class Grammar:
 
         return current_string
 
-    def to_finite_automaton(self):
-        from FiniteAutomaton import FiniteAutomaton
-        states = set(self.V_n)
-        alphabet = set(self.V_t)
-        transitions = {}
-        start_state = self.S
-        accept_states = set()
-
-        for lhs, rhs_list in self.P.items():
-            if lhs not in transitions:
-                transitions[lhs] = {}
-
-            for rhs in rhs_list:
-                if len(rhs) == 1 and rhs in self.V_t:  # A -> a (terminal)
-                    if rhs not in transitions[lhs]:
-                        transitions[lhs][rhs] = set()
-                    transitions[lhs][rhs].add("X")
-                    accept_states.add("X")
-
-                elif len(rhs) == 2 and rhs[0] in self.V_t and rhs[1] in self.V_n:  # A -> aB
-                    symbol, next_state = rhs[0], rhs[1]
-                    if symbol not in transitions[lhs]:
-                        transitions[lhs][symbol] = set()
-                    transitions[lhs][symbol].add(next_state)
-
-                elif len(rhs) == 2 and rhs[1] in self.V_t and rhs[0] in self.V_n:  # A -> Ba
-                    symbol, next_state = rhs[1], rhs[0]
-                    if symbol not in transitions[lhs]:
-                        transitions[lhs][symbol] = set()
-                    transitions[lhs][symbol].add(next_state)
-
-        states.add("X")
-
-        return FiniteAutomaton(states, alphabet, transitions, start_state, accept_states)
-
-    def get_grammar_type(self):
-        # assume all types are satisfied, and then eliminate incorrect ones
-        is_type_3 = True
-        is_type_2 = True
-        is_type_1 = True
-        is_type_0 = True
-
-        is_left_linear = True
-        is_right_linear = True
-        is_invalid = False
-
-        for lhs, rhs_list in self.P.items():
-
-            if not all(symbol in self.V_n or symbol in self.V_t for symbol in lhs):
-                is_invalid = True
-                break
-
-            if len(lhs) > 1:  # type 2 and 3 have only 1 non-terminal on lhs
-                is_type_3 = False
-                is_type_2 = False
-
-            for rhs in rhs_list:
-
-                if not all(symbol in self.V_n or symbol in self.V_t for symbol in rhs):
-                    is_invalid = True
-                    break
-
-                if len(rhs) < len(lhs):  # type 1 needs |rhs| >= |lhs|
-                    is_type_1 = False
-
-                if lhs not in self.V_n:  # type 2 and 3 lhs must: len = 1 (prev checked); be a non-terminal
-                    is_type_2 = False
-                    is_type_3 = False
-
-                # check for type 3
-                if len(rhs) == 1 and rhs[0] in self.V_t:
-                    continue  # skip simple production: A → a
-
-                elif len(rhs) == 2:
-                    if rhs[0] in self.V_t and rhs[1] in self.V_n:
-                        is_left_linear = False  # then all rules should be right linear
-                    elif rhs[0] in self.V_n and rhs[1] in self.V_t:
-                        is_right_linear = False  # then all rules should be left linear
-                    else:
-                        is_type_3 = False  # not regular grammar form (2 non terminals)
+    def sampler(self, seed=None):
+        # silent, reproducible alternative to generate_string for producing many words
+        return GrammarSampler(self, seed)
+
+    def _regular_dfa(self):
+        # compiled DFA of a right- or left-linear grammar, None for any other grammar
+        try:
+            return self.to_finite_automaton().compile()
+        except ValueError:
+            return None
+
+    def enumerate_words(self, max_length):
+        # every word of the language up to max_length in shortlex order, generated lazily;
+        # regular grammars walk their DFA, other grammars an incremental Earley chart
+        dfa = self._regular_dfa()
+        if dfa is not None:
+            yield from dfa.enumerate_words(max_length)
+            return
+        parser = self.earley_parser()
+        terminals = sorted(self.V_t)
+        for length in range(max_length + 1):
+            yield from self._words_of_length(parser, terminals, length)
+
+    @staticmethod
+    def _words_of_length(parser, terminals, length):
+        # depth-first walk over prefixes with one Earley set per prefix symbol; a prefix is
+        # dropped as soon as no item can scan its last terminal
+        chart = parser.initial_chart()
+        word = []
+        stack = [iter(terminals)]
+        while stack:
+            if len(word) < length:
+                for terminal in stack[-1]:
+                    if parser.scan(chart, terminal):
+                        word.append(terminal)
+                        stack.append(iter(terminals))
+                        break
                 else:
-                    is_type_3 = False  # more than 2 symbols in rhs or non-terminal in rhs
-
-        if not is_invalid:
-            if is_type_3:
-                if is_left_linear:
-                    return 3, "Type 3 - Left Linear Regular Grammar"
-                elif is_right_linear:
-                    return 3, "Type 3 - Right Linear Regular Grammar"
-
-            elif is_type_2:
-                return 2, "Type 2 - Context-Free Grammar"
-
-            elif is_type_1:
-                return 1, "Type 1 - Context-Sensitive Grammar"
+                    stack.pop()
+                    if word:
+                        word.pop()
+                        parser.pop(chart)
+                continue
+            if parser.is_complete(chart):
+                yield "".join(word)
+            stack.pop()
+            if word:
+                word.pop()
+                parser.pop(chart)
+
+    def count_words(self, max_length, unambiguous=False, limit=10 ** 5):
+        # counts[n] = number of distinct words of length n. Regular grammars are counted on their DFA
+        # in O(max_length * states). For other grammars, unambiguous=True counts CNF derivation trees
+        # with the DP of GrammarSampler, polynomial in max_length but exact only if every word has one
+        # derivation. Otherwise the words are enumerated one by one, which takes time proportional to
+        # their number, and ValueError is raised once more than `limit` words have been listed.
+        dfa = self._regular_dfa()
+        if dfa is not None:
+            return dfa.count_words(max_length)
+        if unambiguous:
+            sampler = self.sampler()
+            return [sampler.count_derivations(length) for length in range(max_length + 1)]
+
+        parser = self.earley_parser()
+        terminals = sorted(self.V_t)
+        counts = []
+        total = 0
+        for length in range(max_length + 1):
+            count = 0
+            for _ in self._words_of_length(parser, terminals, length):
+                count += 1
+                if total + count > limit:
+                    raise ValueError(
+                        f"more than {limit} words up to length {length}, pass a larger limit "
+                        f"or unambiguous=True for an unambiguous grammar"
+                    )
+            counts.append(count)
+            total += count
+        return counts
+
+    def canonical_hash(self):
+        # independent of set / dict order and of writing a rhs as "aB" or ["a", "B"]; computed once
+        # and kept until the grammar changes
+        key = (self.V_n, self.V_t, self.P, self.S)
+        if self._canonical_hash is None or not self._same(key, self._canonical_hash_key):
+            split = self.symbol_table().split
+            productions = []
+            for lhs, rhs_list in self.P.items():
+                head = "\x1f".join(map(str, split(lhs))) + "\x1e"
+                for rhs in rhs_list:
+                    symbols = rhs if isinstance(rhs, (list, tuple)) else split(rhs)
+                    productions.append(head + "\x1f".join(map(str, symbols)))
+            self._canonical_hash = canonical_digest(
+                map(str, self.V_n), map(str, self.V_t), map(str, self.S), map(str, self.P), productions
+            )
+            self._canonical_hash_key = key
+        return self._canonical_hash
+
+    def to_finite_automaton(self, cache=None):
+        # works for right- and left-linear grammars, raises ValueError for anything else; with a
+        # ResultCache a grammar converted before costs one hash (none if this grammar was hashed
+        # already) and one lookup, and returns the cached, shared automaton
+        if cache is None:
+            return RegularConversion.grammar_to_automaton(self)
+        return cache.get_or_compute("to_finite_automaton", self.canonical_hash(),
+                                    lambda: RegularConversion.grammar_to_automaton(self))
+
+    def cyk_parser(self):
+        # needs a grammar in CNF, e.g. after normalize_cnf()
+        return CYKParser(self)
+
+    def earley_parser(self):
+        return EarleyParser(self)
+
+    def type_index(self):
+        # built on first use, then kept current by add_production/remove_production
+        index = self._current_type_index()
+        if index is None:
+            index = self._type_index = GrammarTypeIndex(self.num_terminals)
+            for lhs, rhs in self.productions():
+                index.add(lhs, rhs)
+            self._type_index_key = self.P
+        return index
+
+    def _current_type_index(self):
+        # the index if it exists and belongs to the current V_n, V_t and P, else None
+        self.symbol_table()
+        if self._type_index_key is not self.P:
+            return None
+        return self._type_index
+
+    def add_production(self, lhs, rhs):
+        # symbols of a new production should already be in V_n / V_t
+        self.P.setdefault(lhs, []).append(rhs)
+        index = self._current_type_index()
+        if index is not None:
+            encode = self.encoder()
+            index.add(encode(lhs), encode(rhs))
+
+    def remove_production(self, lhs, rhs):
+        # raises KeyError / ValueError like the dict and list it edits
+        self.P[lhs].remove(rhs)
+        index = self._current_type_index()
+        if index is not None:
+            encode = self.encoder()
+            index.remove(encode(lhs), encode(rhs))
 
-            elif is_type_0:
-                return 0, "Type 0 - Unrestricted Grammar"
-        else:
-            return -1, "Invalid"
+    def get_grammar_type(self):
+        # constant time once the index exists
+        return self.type_index().grammar_type()
 
     # task lab 5:
     # Get familiar with the approaches of normalizing a grammar.
@@ -158,9 +286,39 @@ class Grammar:
         #     "C": ["Ca"],
         # }
 
-    def normalize_cnf(self):
+    def normalize_cnf(self, cache=None):
+        # with a ResultCache, a grammar written exactly like one normalised before (same symbols and
+        # rules, in the same order) is restored from it instead of recomputed. The steps depend on that
+        # order, so the key is the digest of the grammar as printed, not canonical_hash(). It carries
+        # NORMALIZE_CNF_VERSION, bump it when the steps change so an on-disk cache does not replay
+        # results of older code. The cache holds a copy, this grammar keeps being edited in place.
+        original = str(self)
+        key = f"v{self.NORMALIZE_CNF_VERSION}-{canonical_digest([original])}" if cache is not None else None
+        cached = cache.get("normalize_cnf", key) if cache is not None else None
+        if cached is not None:
+            grammar, steps = cached
+            self.V_n, self.V_t, self.P, self.S = self._copy_parts(grammar)
+        else:
+            steps = self._normalize_cnf_steps()
+            if cache is not None:
+                cache.put("normalize_cnf", key, (self._copy_parts((self.V_n, self.V_t, self.P, self.S)), steps))
+        normalization_steps = {"Original Grammar:": original}
+        normalization_steps.update(steps)
+
+        for key, value in normalization_steps.items():
+            print(key)
+            print(value)
+            print()
+        return normalization_steps
+
+    @staticmethod
+    def _copy_parts(parts):
+        V_n, V_t, P, S = parts
+        P = {lhs: [list(rhs) if isinstance(rhs, list) else rhs for rhs in rhs_list] for lhs, rhs_list in P.items()}
+        return set(V_n), set(V_t), P, set(S)
+
+    def _normalize_cnf_steps(self):
         normalization_steps = {}
-        normalization_steps["Original Grammar:"] = str(self)
 
         # Step 1: Remove epsilon productions
         nullable = self.get_nullable()
@@ -183,13 +341,13 @@ class Grammar:
         self.replace_terminals()
         self.replace_long_productions()
         normalization_steps["Result: Bring to Chomsky Normal Form (CNF)"] = str(self)
-        
-        for key, value in normalization_steps.items():
-            print(key)
-            print(value)
-            print()
         return normalization_steps
 
+    def to_cnf(self, epsilon_mode="classic", max_expansion=1024):
+        # non-mutating counterpart of normalize_cnf, returns a new Grammar;
+        # epsilon_mode="binarize" splits long rules before removing nullables
+        return CNFPipeline(self, epsilon_mode, max_expansion).run()
+
     def get_nullable(self):
         nullable = set()
         for lhs, rhs_list in self.P.items():
@@ -206,6 +364,7 @@ class Grammar:
                         nullable.add(lhs)
                         found = True
 
+        self.invalidate()
         return nullable
 
     def _get_combinations_replacing_epsilon(self, state_string, separator_list):
@@ -222,6 +381,13 @@ class Grammar:
         if len(current_string) > 0:
             parts.append(current_string)
         iterables = [x if isinstance(x, list) else [x] for x in parts]
+        alternatives = 2 ** sum(1 for x in parts if isinstance(x, list))
+        if alternatives > self.MAX_EPSILON_EXPANSION:
+            warnings.warn(
+                f"replacing nullable symbols in {state_string!r} produces {alternatives} alternatives, "
+                f"use to_cnf(epsilon_mode='binarize') for large grammars",
+                RuntimeWarning,
+            )
         result = [''.join(p) for p in product(*iterables)]
 
         return result
@@ -231,38 +397,15 @@ class Grammar:
             for idx, rhs in enumerate(rhs_list):
                 if any(c in rhs for c in nullable):
                     rhs_list[idx:idx+1] = self._get_combinations_replacing_epsilon(rhs, nullable)
+        self.invalidate()
 
     def eliminate_unit_productions(self):
-        for lhs, rhs_list in self.P.items():
-            reachable_states = set()
-            additional_transitions = set()
-            analyzed_states = set()
-            found = False
-            for rhs in rhs_list:
-                if rhs in self.V_n:
-                    reachable_states.add(rhs)
-                    found = True
-
-            while found:
-                found = False
-                for state in reachable_states.copy():
-                    if state not in analyzed_states:
-                        for production in self.P[state]:
-                            if production in self.V_n and production not in analyzed_states and production not in reachable_states:
-                                found = True
-                                reachable_states.add(production)
-                            elif production not in additional_transitions:
-                                additional_transitions.add(production)
-                        analyzed_states.add(state)
-
-            if len(additional_transitions) > 0:
-                additional_transitions -= set(rhs_list)
-                for element in additional_transitions:
-                    if element not in rhs_list:
-                        rhs_list.append(element)
-                for element in reachable_states:
-                    if element in rhs_list:
-                        rhs_list.remove(element)
+        # returns the unit-closure size of every non-terminal as a diagnostic
+        graph = UnitProductionGraph(self.P, lambda rhs: rhs if isinstance(rhs, str) and rhs in self.V_n else None)
+        for lhs, rhs_list in graph.productions.items():
+            self.P[lhs] = rhs_list
+        self.invalidate()
+        return graph.closure_sizes
 
     def eliminate_nonproductive(self):
         # remove production which don't result terminals
@@ -283,6 +426,7 @@ class Grammar:
             self.V_n.remove(state)
             if state in self.S:
                 self.S.remove(state)
+        self.invalidate()
 
     def eliminate_inaccessible(self):
         accessible = self.S.copy()
@@ -302,6 +446,7 @@ class Grammar:
                 del self.P[state]
             if state in self.V_n:
                 self.V_n.remove(state)
+        self.invalidate()
 
     def replace_terminals(self):
         terminal_dict = {}
@@ -320,6 +465,7 @@ class Grammar:
                     else:
                         new_rhs.append(rhs)
                 self.P[lhs] = new_rhs
+        self.invalidate()
 
     def replace_long_productions(self):
         additional_productions = {}
@@ -348,6 +494,7 @@ class Grammar:
 
             for lhs, rhs_list in new_transitions.items():
                 self.P[lhs] = rhs_list
+        self.invalidate()
 
 
     def __str__(self):
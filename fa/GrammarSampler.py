@@ -0,0 +1,195 @@
+import random
+from bisect import bisect_right
+
+
+class GrammarSampler:
+    # silent, seeded word generator for context-free grammars. Rules are precomputed per
+    # non-terminal as symbol tuples and derivations run on an explicit stack (leftmost, terminals
+    # are appended to the output as they are popped), so no sentential form is ever rebuilt.
+    def __init__(self, grammar, seed=None):
+        self.grammar = grammar
+        self.random = random.Random(seed)
+        self.non_terminals = set(grammar.V_n)
+        self.starts = sorted(symbol for symbol in grammar.S if symbol in self.non_terminals)
+        self.rules = {symbol: [] for symbol in self.non_terminals}
+        for lhs, rhs_list in grammar.P.items():
+            if lhs not in self.non_terminals:
+                raise ValueError(f"{lhs} -> ... is not a context-free production")
+            for rhs in rhs_list:
+                self.rules[lhs].append(tuple(grammar.split_rhs(rhs)))
+        self.min_yield, self.shortest_rule = self._shortest_derivations()
+        self._cnf = None
+        self._counts = {}
+        self._options = {}
+
+    def _shortest_derivations(self):
+        # min_yield[A] = length of the shortest terminal word A derives, shortest_rule[A] = a rule achieving it
+        infinity = float("inf")
+        min_yield = {symbol: infinity for symbol in self.non_terminals}
+        shortest_rule = {}
+        changed = True
+        while changed:
+            changed = False
+            for lhs, rules in self.rules.items():
+                for rhs in rules:
+                    length = sum(min_yield[s] if s in self.non_terminals else 1 for s in rhs)
+                    if length < min_yield[lhs]:
+                        min_yield[lhs] = length
+                        shortest_rule[lhs] = rhs
+                        changed = True
+        return min_yield, shortest_rule
+
+    def sample(self, max_length=20):
+        # random derivation; once the output plus the shortest completion of the pending symbols
+        # reaches max_length, only shortest rules are used. Rules that derive nothing (B -> C B C
+        # with nullable C) never hit that bound, so random choices also stop after a fixed number
+        # of expansions, which makes every derivation terminate. None when no start symbol of the
+        # grammar is a non-terminal or none of them derives a word.
+        if not self.starts:
+            return None
+        start = self.random.choice(self.starts)
+        if start not in self.shortest_rule:
+            return None
+        non_terminals = self.non_terminals
+        rules = self.rules
+        shortest_rule = self.shortest_rule
+        min_yield = self.min_yield
+        choice = self.random.choice
+        output = []
+        stack = [start]
+        pending = min_yield[start]
+        budget = (max_length + 1) * len(rules)
+        while stack:
+            symbol = stack.pop()
+            if symbol not in non_terminals:
+                output.append(symbol)
+                pending -= 1
+                continue
+            pending -= min_yield[symbol]
+            budget -= 1
+            rhs = choice(rules[symbol])
+            rhs_yield = sum(min_yield[s] if s in non_terminals else 1 for s in rhs)
+            if rhs_yield == float("inf") or budget < 0 or len(output) + pending + rhs_yield > max_length:
+                rhs = shortest_rule[symbol]
+                rhs_yield = min_yield[symbol]
+            pending += rhs_yield
+            stack.extend(reversed(rhs))
+        return "".join(output)
+
+    def strings(self, count=None, max_length=20):
+        # lazily yields count words (forever if count is None)
+        produced = 0
+        while count is None or produced < count:
+            word = self.sample(max_length)
+            if word is None:
+                return
+            produced += 1
+            yield word
+
+    def _cnf_rules(self):
+        # counting runs on the CNF form, where every rule adds exactly one terminal or one split
+        if self._cnf is None:
+            cnf = self.grammar.to_cnf()
+            rules = {symbol: [] for symbol in cnf.V_n}
+            for lhs, rhs_list in cnf.P.items():
+                rules[lhs] = [tuple(cnf.split_rhs(rhs)) for rhs in rhs_list]
+            self._cnf = sorted(cnf.S), rules
+        return self._cnf
+
+    def count(self, symbol, length):
+        # number of CNF derivation trees of `symbol` with a yield of exactly `length` terminals
+        key = (symbol, length)
+        if key in self._counts:
+            return self._counts[key]
+        _, cnf_rules = self._cnf_rules()
+        for n in range(length + 1):
+            for lhs, rules in cnf_rules.items():
+                if (lhs, n) in self._counts:
+                    continue
+                total = 0
+                for rhs in rules:
+                    if len(rhs) == 0:
+                        total += n == 0
+                    elif len(rhs) == 1:
+                        total += n == 1
+                    elif n >= 2:
+                        left, right = rhs
+                        for k in range(1, n):
+                            total += self._counts[left, k] * self._counts[right, n - k]
+                self._counts[lhs, n] = total
+        return self._counts.get(key, 0)
+
+    def count_derivations(self, length):
+        # CNF derivation trees of all words with this length, the number of words if the grammar is unambiguous
+        starts, _ = self._cnf_rules()
+        return sum(self.count(start, length) for start in starts)
+
+    def sample_uniform(self, length):
+        # uniform over the CNF derivation trees with this yield (uniform over words for unambiguous grammars)
+        starts, cnf_rules = self._cnf_rules()
+        totals = [(start, self.count(start, length)) for start in starts]
+        if not any(total for _, total in totals):
+            return None
+        start = self._weighted(totals)
+        output = []
+        stack = [(start, length)]
+        while stack:
+            symbol, n = stack.pop()
+            if symbol not in cnf_rules:
+                output.append(symbol)
+                continue
+            rhs, k = self._pick(self._split_options(symbol, n, cnf_rules))
+            if k is None:
+                stack.extend((terminal, 1) for terminal in rhs)
+            else:
+                stack.append((rhs[1], n - k))
+                stack.append((rhs[0], k))
+        return "".join(output)
+
+    def _split_options(self, symbol, n, cnf_rules):
+        # (rule, split) choices for `symbol` deriving n terminals with cumulative weights, cached
+        key = (symbol, n)
+        options = self._options.get(key)
+        if options is None:
+            values = []
+            cumulative = []
+            total = 0
+            for rhs in cnf_rules[symbol]:
+                if len(rhs) < 2:
+                    if len(rhs) == n:
+                        total += 1
+                        values.append((rhs, None))
+                        cumulative.append(total)
+                    continue
+                for k in range(1, n):
+                    weight = self._counts[rhs[0], k] * self._counts[rhs[1], n - k]
+                    if weight:
+                        total += weight
+                        values.append((rhs, k))
+                        cumulative.append(total)
+            options = self._options[key] = values, cumulative
+        return options
+
+    def _pick(self, options):
+        values, cumulative = options
+        return values[bisect_right(cumulative, self.random.randrange(cumulative[-1]))]
+
+    def uniform_strings(self, max_length, count=None):
+        # lengths are drawn in proportion to how many derivations each length has, then a uniform word of it
+        weights = [(length, self.count_derivations(length)) for length in range(max_length + 1)]
+        if not any(weight for _, weight in weights):
+            return
+        produced = 0
+        while count is None or produced < count:
+            produced += 1
+            yield self.sample_uniform(self._weighted(weights))
+
+    def _weighted(self, options):
+        # exact integer roulette so huge counts keep their precision
+        total = sum(weight for _, weight in options)
+        point = self.random.randrange(total)
+        for value, weight in options:
+            if point < weight:
+                return value
+            point -= weight
+        raise AssertionError("weights changed during sampling")
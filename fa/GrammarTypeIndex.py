@@ -0,0 +1,57 @@
+class GrammarTypeIndex:
+    # Chomsky type of a grammar kept up to date one production at a time. Every production is
+    # classified on its own into the rules it breaks, and the index only counts how many productions
+    # break each rule, so add/remove cost O(|production|) and the type is read off the counters.
+    # Productions are int tuples from Grammar.encoder(): ids below num_terminals are terminals,
+    # -1 is a symbol outside V_n and V_t.
+    INVALID, NOT_TYPE_1, NOT_TYPE_2, NOT_TYPE_3, RIGHT_LINEAR, LEFT_LINEAR = range(6)
+
+    def __init__(self, num_terminals):
+        self.num_terminals = num_terminals
+        self.counts = [0] * 6
+
+    def classify(self, lhs, rhs):
+        num_terminals = self.num_terminals
+        if -1 in lhs or -1 in rhs:
+            return (self.INVALID,)
+        flags = []
+        if len(rhs) < len(lhs):  # type 1 needs |rhs| >= |lhs|
+            flags.append(self.NOT_TYPE_1)
+        if len(lhs) != 1 or lhs[0] < num_terminals:  # type 2 and 3 lhs must: len = 1; be a non-terminal
+            flags.append(self.NOT_TYPE_2)
+            flags.append(self.NOT_TYPE_3)
+
+        if len(rhs) == 1 and rhs[0] < num_terminals:
+            pass  # simple production: A → a
+        elif len(rhs) == 2 and rhs[0] < num_terminals <= rhs[1]:
+            flags.append(self.RIGHT_LINEAR)  # A → aB
+        elif len(rhs) == 2 and rhs[1] < num_terminals <= rhs[0]:
+            flags.append(self.LEFT_LINEAR)  # A → Ba
+        else:
+            flags.append(self.NOT_TYPE_3)  # two non-terminals, more than 2 symbols or empty rhs
+        return flags
+
+    def add(self, lhs, rhs):
+        for flag in self.classify(lhs, rhs):
+            self.counts[flag] += 1
+
+    def remove(self, lhs, rhs):
+        # the production must have been added before, classification is recomputed instead of stored
+        for flag in self.classify(lhs, rhs):
+            self.counts[flag] -= 1
+
+    def grammar_type(self):
+        counts = self.counts
+        if counts[self.INVALID]:
+            return -1, "Invalid"
+        if not counts[self.NOT_TYPE_3]:
+            if not counts[self.RIGHT_LINEAR]:
+                return 3, "Type 3 - Left Linear Regular Grammar"
+            if not counts[self.LEFT_LINEAR]:
+                return 3, "Type 3 - Right Linear Regular Grammar"
+            # mixing A → aB and A → Ba rules is not regular, fall through to type 2
+        if not counts[self.NOT_TYPE_2]:
+            return 2, "Type 2 - Context-Free Grammar"
+        if not counts[self.NOT_TYPE_1]:
+            return 1, "Type 1 - Context-Sensitive Grammar"
+        return 0, "Type 0 - Unrestricted Grammar"
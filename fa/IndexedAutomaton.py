@@ -0,0 +1,107 @@
+from .SymbolTable import SymbolTable
+from .StronglyConnectedComponents import strongly_connected_components
+
+EPSILON = ""
+
+
+def freeze_state(state):
+    # composite states (e.g. produced by nfa_to_dfa) are stored as sets, make them hashable
+    if isinstance(state, (set, frozenset, list)):
+        return frozenset(state)
+    return state
+
+
+def state_sort_key(state):
+    if isinstance(state, frozenset):
+        return 0, sorted(map(str, state))
+    return 1, [str(state)]
+
+
+class IndexedAutomaton:
+    # dense integer view of a FiniteAutomaton: states and symbols are numbered 0..n-1,
+    # delta[state] = {symbol_id: (target ids)}, epsilon[state] = (target ids) for "" transitions
+    def __init__(self, states, symbols, starts, accepting, delta, epsilon=None):
+        self.states = states
+        self.symbols = symbols
+        self.symbol_table = SymbolTable(symbols)
+        self.symbol_index = self.symbol_table.index
+        self.starts = starts
+        self.accepting = accepting
+        self.delta = delta
+        self.epsilon = epsilon if epsilon is not None else [()] * len(states)
+        self.has_epsilon = any(self.epsilon)
+        self.closures = self._epsilon_closures()
+
+    @classmethod
+    def from_automaton(cls, fa):
+        keys = {freeze_state(state) for state in fa.states}
+
+        def targets(next_states):
+            # a set that is itself a state of the automaton is one (composite) target
+            frozen = freeze_state(next_states)
+            if frozen in keys or not isinstance(frozen, frozenset):
+                return [frozen]
+            return list(frozen)
+
+        symbols = set(fa.alphabet)
+        for transitions in fa.transitions.values():
+            symbols.update(transitions)
+            for next_states in transitions.values():
+                keys.update(targets(next_states))
+        keys.update(freeze_state(state) for state in fa.transitions)
+
+        start = freeze_state(fa.start_state)
+        starts = targets(fa.start_state) if isinstance(start, frozenset) else [start]
+        keys.update(starts)
+
+        states = sorted(keys, key=state_sort_key)
+        state_index = {state: i for i, state in enumerate(states)}
+        symbols.discard(EPSILON)
+        symbols = sorted(symbols, key=str)
+        symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+
+        delta = [{} for _ in states]
+        epsilon = [()] * len(states)
+        for state, transitions in fa.transitions.items():
+            state_id = state_index[freeze_state(state)]
+            for symbol, next_states in transitions.items():
+                ids = tuple(sorted({state_index[target] for target in targets(next_states)}))
+                if symbol == EPSILON:
+                    epsilon[state_id] = ids
+                else:
+                    delta[state_id][symbol_index[symbol]] = ids
+
+        accept_keys = {freeze_state(state) for state in fa.accept_states}
+        accepting = [state in accept_keys for state in states]
+        return cls(states, symbols, sorted({state_index[s] for s in starts}), accepting, delta, epsilon)
+
+    def _epsilon_closures(self):
+        # closure bitmask per state, computed once on the SCC condensation of the epsilon graph:
+        # every state of a component shares one closure, components are finished sinks-first
+        closures = [1 << state for state in range(len(self.states))]
+        if not self.has_epsilon:
+            return closures
+        components, component_of = strongly_connected_components(len(self.states), self.epsilon)
+        for component_id, component in enumerate(components):
+            mask = 0
+            for state in component:
+                mask |= 1 << state
+                for target in self.epsilon[state]:
+                    if component_of[target] != component_id:
+                        mask |= closures[target]
+            for state in component:
+                closures[state] = mask
+        return closures
+
+    def closure(self, states):
+        mask = 0
+        for state in states:
+            mask |= self.closures[state]
+        return mask
+
+    def is_deterministic(self):
+        return (
+            not self.has_epsilon
+            and len(self.starts) <= 1
+            and all(len(ids) <= 1 for row in self.delta for ids in row.values())
+        )
@@ -0,0 +1,83 @@
+class _LazyState:
+    __slots__ = ("mask", "accepting", "next")
+
+    def __init__(self, mask, accepting, num_symbols):
+        self.mask = mask
+        self.accepting = accepting
+        self.next = [None] * num_symbols
+
+
+class LazyDFA:
+    # on-the-fly subset construction over a BitsetNFA: DFA states are built the first time a
+    # query reaches them and kept in a bounded cache; when the cache is full it is flushed
+    # completely and matching carries on from the current state (same policy as RE2)
+    def __init__(self, nfa, max_states=10000):
+        self.nfa = nfa
+        self.max_states = max(2, max_states)
+        self.hits = 0
+        self.misses = 0
+        self.flushes = 0
+        self._cache = {}
+        self._start = None
+
+    def _intern(self, mask):
+        state = self._cache.get(mask)
+        if state is None:
+            state = _LazyState(mask, bool(mask & self.nfa.accept_mask), len(self.nfa.symbols))
+            self._cache[mask] = state
+        return state
+
+    def _start_state(self):
+        if self._start is None:
+            self._start = self._intern(self.nfa.start_mask)
+        return self._start
+
+    def _transition(self, state, symbol):
+        self.misses += 1
+        target = self.nfa.step(state.mask, symbol)
+        if target not in self._cache and len(self._cache) >= self.max_states:
+            self.flush()
+            state.next = [None] * len(state.next)
+            self._cache[state.mask] = state
+        next_state = self._intern(target)
+        state.next[symbol] = next_state
+        return next_state
+
+    def flush(self):
+        self.flushes += 1
+        self._cache.clear()
+        self._start = None
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "flushes": self.flushes,
+            "cached_states": len(self._cache),
+        }
+
+    def matches(self, input_string):
+        input_string = self.nfa.split(input_string)
+        symbol_index = self.nfa.symbol_index
+        state = self._start_state()
+        misses = self.misses
+        steps = 0
+        accepted = False
+        for char in input_string:
+            symbol = symbol_index.get(char)
+            if symbol is None:
+                break
+            steps += 1
+            next_state = state.next[symbol]
+            if next_state is None:
+                next_state = self._transition(state, symbol)
+            state = next_state
+            if not state.mask:
+                break
+        else:
+            accepted = state.accepting
+        self.hits += steps - (self.misses - misses)
+        return accepted
+
+    def __repr__(self):
+        return f"LazyDFA(max_states={self.max_states}, stats={self.stats()})"
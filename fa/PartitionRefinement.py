@@ -0,0 +1,64 @@
+class PartitionRefinement:
+    # partition of 0..n-1 kept as one permuted array: block b owns elements[first[b]:end[b]],
+    # marked elements of a block are swapped to its front (first[b]:marked[b])
+    def __init__(self, n, blocks):
+        self.elements = []
+        self.position = [0] * n
+        self.block_of = [0] * n
+        self.first = []
+        self.end = []
+        self.marked = []
+        self.touched = []
+        for members in blocks:
+            if not members:
+                continue
+            block = len(self.first)
+            self.first.append(len(self.elements))
+            for element in members:
+                self.position[element] = len(self.elements)
+                self.block_of[element] = block
+                self.elements.append(element)
+            self.end.append(len(self.elements))
+            self.marked.append(self.first[block])
+
+    def __len__(self):
+        return len(self.first)
+
+    def size(self, block):
+        return self.end[block] - self.first[block]
+
+    def members(self, block):
+        return self.elements[self.first[block]:self.end[block]]
+
+    def mark(self, element):
+        block = self.block_of[element]
+        index = self.position[element]
+        front = self.marked[block]
+        if index < front:
+            return
+        if front == self.first[block]:
+            self.touched.append(block)
+        other = self.elements[front]
+        self.elements[front], self.elements[index] = element, other
+        self.position[element], self.position[other] = front, index
+        self.marked[block] = front + 1
+
+    def split(self):
+        # split every touched block into its marked and unmarked parts, returns (old, new) pairs
+        splits = []
+        for block in self.touched:
+            front = self.marked[block]
+            self.marked[block] = self.first[block]
+            if front == self.end[block]:
+                continue
+            new_block = len(self.first)
+            self.first.append(self.first[block])
+            self.end.append(front)
+            self.marked.append(self.first[block])
+            self.first[block] = front
+            self.marked[block] = front
+            for index in range(self.first[new_block], front):
+                self.block_of[self.elements[index]] = new_block
+            splits.append((block, new_block))
+        self.touched = []
+        return splits
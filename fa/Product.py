@@ -0,0 +1,121 @@
+from array import array
+from collections import deque
+
+from .CompiledDFA import CompiledDFA
+
+SINK = -1  # stands for an operand's dead state
+
+
+class _Side:
+    # one operand of a product, re-indexed onto the shared alphabet; missing symbols and the
+    # operand's own dead state both map to SINK
+    def __init__(self, dfa, symbols):
+        self.dfa = dfa
+        self.columns = [dfa.symbol_index.get(symbol, -1) for symbol in symbols]
+
+    def step(self, state, symbol):
+        column = self.columns[symbol]
+        if state == SINK or column < 0:
+            return SINK
+        target = self.dfa.table[state * self.dfa.width + column]
+        return SINK if target == self.dfa.dead else target
+
+    def accepts(self, state):
+        return state != SINK and bool(self.dfa.accepting[state])
+
+    def start(self):
+        return SINK if self.dfa.start == self.dfa.dead else self.dfa.start
+
+    def label(self, state):
+        return None if state == SINK else self.dfa.labels[state]
+
+
+def _sides(first, second):
+    symbols = sorted(set(first.symbols) | set(second.symbols), key=str)
+    return symbols, _Side(first, symbols), _Side(second, symbols)
+
+
+OPERATIONS = {
+    "intersection": lambda a, b: a and b,
+    "union": lambda a, b: a or b,
+    "difference": lambda a, b: a and not b,
+}
+
+
+def product(first, second, operation):
+    # explores only the product states reachable from the pair of start states
+    accept = OPERATIONS[operation]
+    symbols, left, right = _sides(first, second)
+    width = len(symbols)
+
+    start = (left.start(), right.start())
+    ids = {start: 0}
+    pairs = [start]
+    table = array('i')
+    for p, q in pairs:
+        for symbol in range(width):
+            target = (left.step(p, symbol), right.step(q, symbol))
+            target_id = ids.get(target)
+            if target_id is None:
+                target_id = ids[target] = len(pairs)
+                pairs.append(target)
+            table.append(target_id)
+
+    accepting = bytearray(accept(left.accepts(p), right.accepts(q)) for p, q in pairs)
+    labels = [(left.label(p), right.label(q)) for p, q in pairs]
+    return CompiledDFA(labels, symbols, table, 0, accepting, ids.get((SINK, SINK), -1))
+
+
+def shortest_distinguishing_word(first, second):
+    # breadth-first over reachable pairs, stops at the first pair whose acceptance differs
+    symbols, left, right = _sides(first, second)
+    start = (left.start(), right.start())
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        p, q = pair
+        if left.accepts(p) != right.accepts(q):
+            word = []
+            while previous[pair] is not None:
+                pair, symbol = previous[pair]
+                word.append(symbols[symbol])
+            return "".join(reversed(word))
+        for symbol in range(len(symbols)):
+            target = (left.step(p, symbol), right.step(q, symbol))
+            if target not in previous:
+                previous[target] = (pair, symbol)
+                queue.append(target)
+    return None
+
+
+def equivalent(first, second):
+    # Hopcroft-Karp: union-find over the states of both DFAs, merging the pairs reached together;
+    # the product is only walked again (breadth-first) to extract a shortest counterexample
+    symbols, left, right = _sides(first, second)
+    offset = first.num_states + 1
+    parent = list(range(offset + second.num_states + 1))
+
+    def node(side_offset, state):
+        return side_offset + (0 if state == SINK else state + 1)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    start = (left.start(), right.start())
+    parent[find(node(0, start[0]))] = find(node(offset, start[1]))
+    stack = [start]
+    while stack:
+        p, q = stack.pop()
+        if left.accepts(p) != right.accepts(q):
+            return False, shortest_distinguishing_word(first, second)
+        for symbol in range(len(symbols)):
+            p2, q2 = left.step(p, symbol), right.step(q, symbol)
+            root_p, root_q = find(node(0, p2)), find(node(offset, q2))
+            if root_p != root_q:
+                parent[root_p] = root_q
+                stack.append((p2, q2))
+    return True, None
@@ -0,0 +1,189 @@
+from collections import deque
+
+from .IndexedAutomaton import EPSILON, IndexedAutomaton
+
+# Regular grammar <-> finite automaton conversion on interned ints. Grammar side: the int
+# tuples of Grammar.productions(), non-terminal ids are shifted down by num_terminals to become
+# state ids. Automaton side: edges are (source, terminal id, target) triples, terminal id -1 is
+# an epsilon move. Names are only attached when the result is materialised.
+
+
+def _fresh(base, taken):
+    name = base
+    counter = 0
+    while name in taken:
+        name = f"{base}{counter}"
+        counter += 1
+    taken.add(name)
+    return name
+
+
+def _linear_form(lhs, rhs, num_terminals):
+    # "right" for A -> w B, "left" for A -> B w (|w| >= 1), "both" for A -> w, A -> B and A -> ""
+    if len(lhs) != 1 or lhs[0] < num_terminals or -1 in rhs:
+        return None
+    positions = [position for position, symbol in enumerate(rhs) if symbol >= num_terminals]
+    if not positions or len(rhs) == 1:
+        return "both" if len(positions) <= 1 else None
+    if len(positions) > 1:
+        return None
+    if positions[0] == len(rhs) - 1:
+        return "right"
+    if positions[0] == 0:
+        return "left"
+    return None
+
+
+def _right_linear_nfa(productions, num_terminals, num_non_terminals):
+    # states 0..num_non_terminals-1 are the non-terminals, then one final state, then the
+    # intermediate states of rules with more than one terminal (A -> abB is A -a-> t -b-> B)
+    final = num_non_terminals
+    num_states = final + 1
+    edges = []
+    for lhs, rhs in productions:
+        source = lhs[0] - num_terminals
+        if rhs and rhs[-1] >= num_terminals:
+            terminals, target = rhs[:-1], rhs[-1] - num_terminals
+        else:
+            terminals, target = rhs, final
+        if not terminals:
+            edges.append((source, -1, target))
+            continue
+        for terminal in terminals[:-1]:
+            edges.append((source, terminal, num_states))
+            source = num_states
+            num_states += 1
+        edges.append((source, terminals[-1], target))
+    return num_states, edges, final
+
+
+def grammar_to_automaton(grammar):
+    # right-linear grammars map directly; a left-linear grammar is reversed (A -> B w becomes
+    # A -> w^R B), converted, and the automaton is reversed back, so no rule is misread
+    from .FiniteAutomaton import FiniteAutomaton
+
+    table = grammar.symbol_table()
+    num_terminals = grammar.num_terminals
+    num_non_terminals = len(table) - num_terminals
+    productions = grammar.productions()
+    found = set()
+    for lhs, rhs in productions:
+        form = _linear_form(lhs, rhs, num_terminals)
+        if form is None:
+            raise ValueError(
+                f"{' '.join(map(str, table.decode(lhs)))} -> {' '.join(map(str, table.decode(rhs)))} "
+                f"is not a regular production"
+            )
+        found.add(form)
+    if {"left", "right"} <= found:
+        raise ValueError("grammar mixes left-linear and right-linear productions")
+    left_linear = "left" in found
+
+    starts = [table.get(symbol) - num_terminals for symbol in sorted(grammar.S, key=str)
+              if table.get(symbol, -1) >= num_terminals]
+    if left_linear:
+        productions = [(lhs, rhs[1:][::-1] + rhs[:1]) for lhs, rhs in productions]
+    num_states, edges, final = _right_linear_nfa(productions, num_terminals, num_non_terminals)
+    if left_linear:
+        edges = [(target, symbol, source) for source, symbol, target in edges]
+        starts, accepting = [final], starts
+    else:
+        accepting = [final]
+
+    # names: non-terminals keep theirs, the other states get fresh ones
+    taken = set(map(str, table.names))
+    names = [str(table[num_terminals + state]) for state in range(num_non_terminals)]
+    names.append(_fresh("q_f", taken))
+    names.extend(_fresh(f"q{state}", taken) for state in range(len(names), num_states))
+    if len(starts) == 1:
+        start_state = names[starts[0]]
+    else:
+        # several start symbols: one new start with epsilon moves into each of them
+        names.append(_fresh("q_s", taken))
+        edges.extend((len(names) - 1, -1, start) for start in starts)
+        start_state = names[-1]
+
+    transitions = {}
+    for source, symbol, target in edges:
+        row = transitions.setdefault(names[source], {})
+        row.setdefault(EPSILON if symbol < 0 else table[symbol], set()).add(names[target])
+    return FiniteAutomaton(set(names), set(grammar.V_t), transitions, start_state, {names[state] for state in accepting})
+
+
+def _state_names(states, symbols):
+    # original names if they are distinct strings that do not clash with a terminal, q0, q1, ... otherwise
+    names = [state for state in states if isinstance(state, str)]
+    if len(names) == len(states) and not set(names) & set(symbols) and EPSILON not in names:
+        return names
+    taken = set(map(str, symbols))
+    return [_fresh(f"q{state}", taken) for state in range(len(states))]
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def automaton_to_grammar(fa):
+    # right-linear grammar: p -a-> r gives p -> a r when r still derives something and p -> a when
+    # r (through epsilon moves) accepts; epsilon moves are folded in with the closures and states
+    # that cannot reach acceptance are left out, so every production is A -> a, A -> aB or S -> ""
+    from .Grammar import Grammar
+
+    indexed = IndexedAutomaton.from_automaton(fa)
+    num_states = len(indexed.states)
+    members = [list(_bits(mask)) for mask in indexed.closures]
+
+    reverse = [[] for _ in range(num_states)]
+    for state in range(num_states):
+        for targets in indexed.delta[state].values():
+            for target in targets:
+                reverse[target].append(state)
+        for target in indexed.epsilon[state]:
+            reverse[target].append(state)
+    live = bytearray(indexed.accepting)
+    queue = deque(state for state in range(num_states) if live[state])
+    while queue:
+        for source in reverse[queue.popleft()]:
+            if not live[source]:
+                live[source] = 1
+                queue.append(source)
+
+    accepts = [any(indexed.accepting[member] for member in members[state]) for state in range(num_states)]
+    # moves[p] = sorted (symbol, target) pairs readable from p's closure that lead to a live state
+    moves = []
+    for state in range(num_states):
+        pairs = set()
+        for member in members[state]:
+            for symbol, targets in indexed.delta[member].items():
+                pairs.update((symbol, target) for target in targets if live[target])
+        moves.append(sorted(pairs))
+
+    symbols = indexed.symbols
+    names = _state_names(indexed.states, symbols)
+    P = {}
+    for state in range(num_states):
+        rules = []
+        final_symbols = set()
+        for symbol, target in moves[state]:
+            terminal = symbols[symbol]
+            if moves[target]:
+                if len(str(terminal)) == 1 and len(names[target]) == 1:
+                    rules.append(f"{terminal}{names[target]}")
+                else:
+                    rules.append([terminal, names[target]])
+            if accepts[target] and symbol not in final_symbols:
+                final_symbols.add(symbol)
+                rules.append(terminal)
+        if rules:
+            P[names[state]] = rules
+
+    starts = [start for start in indexed.starts if live[start]]
+    for start in starts:
+        if accepts[start]:
+            P.setdefault(names[start], []).append("")
+    S = {names[start] for start in starts}
+    non_terminals = set(P) | S
+    return Grammar(non_terminals, set(symbols), P, S)
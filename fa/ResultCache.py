@@ -0,0 +1,250 @@
+import atexit
+import gc
+import hashlib
+import json
+import os
+import tempfile
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+def canonical_digest(*parts):
+    # sha256 over parts that are each a collection of strings; every part is sorted first, so the
+    # digest depends neither on set / dict iteration order nor on PYTHONHASHSEED. Separators are
+    # ASCII control characters, which do not occur in symbol or state names.
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update("\x1d".join(sorted(part)).encode("utf-8"))
+        digest.update(b"\x1c")
+    return digest.hexdigest()
+
+
+_MISSING = object()
+_NAMES = {str}
+_CONTAINERS = ((tuple, "tuple"), (list, "list"), (frozenset, "frozenset"), (set, "set"))
+_STATE_TAGS = {tuple: "t", frozenset: "f", set: "s"}
+_STATE_TYPES = {tag: container for container, tag in _STATE_TAGS.items()}
+
+
+class _NameIds(dict):
+    # name -> id, new names get the next id
+    def __missing__(self, name):
+        self[name] = len(self)
+        return self[name]
+
+
+class _StateTable:
+    # states of an automaton are names or flat containers of names (the subset states of
+    # nfa_to_dfa). Every distinct state is written once, as a name id or as a type tag followed by
+    # name ids, and is referred to by its index everywhere else; reading an entry back builds each
+    # state once and shares it between those places (cached results are read-only anyway).
+    # Other states raise TypeError or KeyError, and the automaton falls back to the generic form.
+    def __init__(self):
+        self.names = _NameIds()
+        self.rows = []
+        self.seen = {str: {}, tuple: {}, frozenset: {}, set: {}}
+
+    def index(self, state):
+        kind = type(state)
+        seen = self.seen[kind]
+        key = frozenset(state) if kind is set else state
+        index = seen.get(key)
+        if index is None:
+            index = seen[key] = len(self.rows)
+            if kind is str:
+                self.rows.append(self.names[state])
+            else:
+                self.rows.append([_STATE_TAGS[kind], *map(self.names.__getitem__, state)])
+        return index
+
+    def data(self, symbols=()):
+        if not set(map(type, self.names)) <= _NAMES or not set(map(type, symbols)) <= _NAMES:
+            raise TypeError("automaton states are not names")
+        return [list(self.names), self.rows]
+
+    @staticmethod
+    def states(data):
+        names, rows = data
+        return [names[row] if type(row) is int else _STATE_TYPES[row[0]](map(names.__getitem__, row[1:]))
+                for row in rows]
+
+
+def _encode_automaton(automaton):
+    table = _StateTable()
+    index = table.index
+    rows = []
+    symbols = set()
+    for state, moves in automaton.transitions.items():
+        symbols.update(moves)
+        rows.append([index(state), list(moves), list(map(index, moves.values()))])
+    states = [_STATE_TAGS.get(type(automaton.states), "l"), list(map(index, automaton.states))]
+    accept = [_STATE_TAGS.get(type(automaton.accept_states), "l"), list(map(index, automaton.accept_states))]
+    start = index(automaton.start_state)
+    return [table.data(symbols), states, to_data(automaton.alphabet), rows, start, accept]
+
+
+def _decode_automaton(body):
+    table, states, alphabet, rows, start, accept = body
+    state_of = _StateTable.states(table).__getitem__
+    collection = {"l": list, **_STATE_TYPES}
+    transitions = {state_of(state): dict(zip(symbols, map(state_of, targets))) for state, symbols, targets in rows}
+    return (collection[states[0]](map(state_of, states[1])), from_data(alphabet), transitions, state_of(start),
+            collection[accept[0]](map(state_of, accept[1])))
+
+
+def to_data(value):
+    # JSON-ready form of a cached result: containers are tagged with their type and automata are
+    # stored field by field, so reading an entry back never runs code found in the cache directory.
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    for container, tag in _CONTAINERS:
+        if isinstance(value, container):
+            items = list(value)
+            if not set(map(type, items)) <= _NAMES:
+                items = [to_data(item) for item in items]
+            return {tag: items}
+    if isinstance(value, dict):
+        return {"dict": [[to_data(key), to_data(item)] for key, item in value.items()]}
+    from .CompiledDFA import CompiledDFA
+    from .FiniteAutomaton import FiniteAutomaton
+
+    if isinstance(value, FiniteAutomaton):
+        try:
+            return {"FiniteAutomaton": _encode_automaton(value)}
+        except (TypeError, KeyError, AttributeError):
+            parts = (value.states, value.alphabet, value.transitions, value.start_state, value.accept_states)
+            return {"FiniteAutomaton": [None, *map(to_data, parts)]}
+    if isinstance(value, CompiledDFA):
+        try:
+            table = _StateTable()
+            labels = list(map(table.index, value.labels))
+            table = table.data()
+        except (TypeError, KeyError):
+            table, labels = None, to_data(value.labels)
+        return {"CompiledDFA": [table, labels, to_data(value.symbols), list(value.table), value.start,
+                                list(value.accepting), value.dead]}
+    raise TypeError(f"{type(value).__name__} cannot be stored in a cache directory")
+
+
+def from_data(data):
+    if not isinstance(data, dict):
+        return data
+    (tag, body), = data.items()
+    for container, name in _CONTAINERS:
+        if tag == name:
+            if set(map(type, body)) <= _NAMES:
+                return container(body)
+            return container(map(from_data, body))
+    if tag == "dict":
+        return {from_data(key): from_data(item) for key, item in body}
+    from .CompiledDFA import CompiledDFA
+    from .FiniteAutomaton import FiniteAutomaton
+
+    if tag == "FiniteAutomaton":
+        if body[0] is None:
+            return FiniteAutomaton(*map(from_data, body[1:]))
+        return FiniteAutomaton(*_decode_automaton(body))
+    if tag == "CompiledDFA":
+        states, labels, symbols, table, start, accepting, dead = body
+        labels = from_data(labels) if states is None else list(map(_StateTable.states(states).__getitem__, labels))
+        return CompiledDFA(labels, from_data(symbols), array('i', table), start, bytearray(accepting), dead)
+    raise ValueError(f"unknown cache entry type {tag!r}")
+
+
+@contextmanager
+def _collector_paused():
+    # reading or writing an entry allocates one container per state and transition, which would
+    # otherwise set off the cyclic garbage collector many times over
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class ResultCache:
+    # LRU of computed results keyed by (kind, key), optionally backed by a directory of JSON files
+    # shared between processes and runs. The LRU keeps the live objects, so a hit costs one lookup
+    # and returns the stored object itself: callers treat cached results as read-only (normalize_cnf
+    # stores and restores copies of the grammar it edits in place). Directory entries are plain
+    # data (see to_data), read back only on a miss in memory. They are written behind: put() only
+    # queues the result, and flush() - called once max_entries results are waiting, and at exit -
+    # writes them, so a miss costs no more than computing the result.
+    def __init__(self, max_entries=256, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.unwritten = {}
+        self.hits = 0
+        self.misses = 0
+        if directory is not None:
+            atexit.register(self.flush)
+
+    def _path(self, kind, key):
+        return os.path.join(self.directory, kind, f"{key}.json")
+
+    def _remember(self, kind, key, value):
+        self.entries[kind, key] = value
+        self.entries.move_to_end((kind, key))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, kind, key, default=None):
+        value = self.entries.get((kind, key), _MISSING)
+        if value is not _MISSING:
+            self.entries.move_to_end((kind, key))
+        elif self.directory is not None:
+            value = self.unwritten.get((kind, key), _MISSING)
+            if value is _MISSING:
+                try:
+                    with open(self._path(kind, key), encoding="utf-8") as file, _collector_paused():
+                        value = from_data(json.loads(file.read()))
+                except FileNotFoundError:
+                    pass
+            if value is not _MISSING:
+                self._remember(kind, key, value)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, kind, key, value):
+        self._remember(kind, key, value)
+        if self.directory is not None:
+            self.unwritten[kind, key] = value
+            if len(self.unwritten) >= self.max_entries:
+                self.flush()
+
+    def flush(self):
+        # write to a temporary file and rename, so readers never see a partial entry
+        with _collector_paused():
+            while self.unwritten:
+                (kind, key), value = self.unwritten.popitem()
+                folder = os.path.join(self.directory, kind)
+                os.makedirs(folder, exist_ok=True)
+                handle, temporary = tempfile.mkstemp(dir=folder)
+                with os.fdopen(handle, "w", encoding="utf-8") as file:
+                    file.write(json.dumps(to_data(value)))
+                os.replace(temporary, self._path(kind, key))
+
+    def get_or_compute(self, kind, key, compute):
+        value = self.get(kind, key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(kind, key, value)
+        return value
+
+    def clear(self):
+        # drops the in-memory entries only, the directory is left as it is and queued entries
+        # are still written
+        self.entries.clear()
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+default_cache = ResultCache()
@@ -0,0 +1,80 @@
+class StreamMatcher:
+    # resumable membership check over a CompiledDFA: only the current state survives between
+    # feed() calls. str chunks are matched per character, bytes-like chunks (bytes, bytearray,
+    # memoryview, mmap) per byte through a 256-entry column table, read in place through a memoryview.
+    # Over multi-character symbols chunks are split by the DFA's symbol table (bytes as latin-1, one
+    # character per byte); a symbol may straddle two chunks, so the last characters of a chunk wait
+    # in `pending` until the next feed() or result().
+    REJECTED = -2
+
+    def __init__(self, dfa):
+        self.dfa = dfa
+        self.byte_columns = [-1] * 256
+        for symbol, column in dfa.symbol_index.items():
+            if isinstance(symbol, str) and len(symbol) == 1 and ord(symbol) < 256:
+                self.byte_columns[ord(symbol)] = column
+        self.symbol_table = dfa.symbol_table if dfa.symbol_table.max_length > 1 else None
+        self.reset()
+
+    def reset(self):
+        self.state = self.dfa.start
+        self.pending = ""
+
+    @property
+    def rejected(self):
+        return self.state == self.REJECTED or self.state == self.dfa.dead
+
+    def feed(self, chunk):
+        if self.rejected:
+            return self
+        if self.symbol_table is not None:
+            if not isinstance(chunk, str):
+                chunk = bytes(chunk).decode("latin-1")
+            symbols, self.pending = self.symbol_table.split_complete(self.pending + chunk)
+            self.state = self._run(self.state, symbols, self.dfa.symbol_index.get)
+        elif isinstance(chunk, str):
+            self.state = self._run(self.state, chunk, self.dfa.symbol_index.get)
+        else:
+            view = memoryview(chunk)
+            if view.format != 'B' or view.ndim != 1:
+                view = view.cast('B')
+            self.state = self._run(self.state, view, self.byte_columns.__getitem__)
+        return self
+
+    def _run(self, state, units, column_of):
+        table = self.dfa.table
+        width = self.dfa.width
+        dead = self.dfa.dead
+        for unit in units:
+            column = column_of(unit)
+            if column is None or column < 0:
+                return self.REJECTED
+            state = table[state * width + column]
+            if state == dead:
+                break
+        return state
+
+    def feed_stream(self, stream, chunk_size=1 << 16):
+        # reads a binary file object / socket file into one reusable buffer
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while not self.rejected:
+            size = stream.readinto(buffer)
+            if not size:
+                break
+            self.feed(view[:size])
+        return self
+
+    def result(self):
+        # the pending characters are read as if the input ended here, the matcher itself is not advanced
+        if self.rejected:
+            return False
+        state = self.state
+        if self.pending:
+            state = self._run(state, self.symbol_table.split(self.pending), self.dfa.symbol_index.get)
+            if state == self.REJECTED or state == self.dfa.dead:
+                return False
+        return bool(self.dfa.accepting[state])
+
+    def __repr__(self):
+        return f"StreamMatcher(state={self.state}, rejected={self.rejected})"
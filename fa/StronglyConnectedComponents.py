@@ -0,0 +1,49 @@
+def strongly_connected_components(num_nodes, successors):
+    # iterative Tarjan; successors[node] is an iterable of node ids.
+    # Components come out in reverse topological order (a component only points to earlier ones).
+    index = [-1] * num_nodes
+    lowlink = [0] * num_nodes
+    on_stack = bytearray(num_nodes)
+    stack = []
+    components = []
+    component_of = [-1] * num_nodes
+    counter = 0
+
+    for root in range(num_nodes):
+        if index[root] >= 0:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [(root, iter(successors[root]))]
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if index[child] < 0:
+                    index[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack[child] = 1
+                    work.append((child, iter(successors[child])))
+                    break
+                if on_stack[child] and index[child] < lowlink[node]:
+                    lowlink[node] = index[child]
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    if lowlink[node] < lowlink[parent]:
+                        lowlink[parent] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component_of[member] = len(components)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+    return components, component_of
@@ -0,0 +1,79 @@
+class SymbolTable:
+    # dense int ids for grammar symbols and automaton alphabets. Names can be any length
+    # ("a", "T_a", "X12"), split() cuts a production string into known names by longest match,
+    # and encode()/decode() convert between name sequences and int tuples.
+    def __init__(self, names=()):
+        self.names = []
+        self.index = {}
+        self.max_length = 1
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        symbol = self.index.get(name)
+        if symbol is None:
+            symbol = self.index[name] = len(self.names)
+            self.names.append(name)
+            if isinstance(name, str) and len(name) > self.max_length:
+                self.max_length = len(name)
+        return symbol
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, symbol):
+        return self.names[symbol]
+
+    def get(self, name, default=None):
+        return self.index.get(name, default)
+
+    def split(self, text):
+        # longest known name at every position, characters that start no name stand alone
+        if text in self.index:
+            return [text] if text else []
+        if self.max_length == 1:
+            return list(text)
+        index = self.index
+        symbols = []
+        position = 0
+        while position < len(text):
+            for length in range(min(self.max_length, len(text) - position), 0, -1):
+                name = text[position:position + length]
+                if name in index:
+                    break
+            symbols.append(name)
+            position += length
+        return symbols
+
+    def split_complete(self, text):
+        # split() for text that may continue: returns the names that no following character can
+        # change and the unread rest, shorter than max_length, to prepend to the next piece
+        if self.max_length == 1:
+            return list(text), ""
+        index = self.index
+        symbols = []
+        position = 0
+        while len(text) - position >= self.max_length:
+            for length in range(self.max_length, 0, -1):
+                name = text[position:position + length]
+                if name in index:
+                    break
+            symbols.append(name)
+            position += length
+        return symbols, text[position:]
+
+    def encode(self, names, intern=True):
+        # unknown names are interned (or mapped to -1 with intern=False, leaving the table unchanged)
+        if intern:
+            return tuple(self.intern(name) for name in names)
+        index = self.index
+        return tuple(index.get(name, -1) for name in names)
+
+    def decode(self, symbols):
+        return [self.names[symbol] for symbol in symbols]
+
+    def __repr__(self):
+        return f"SymbolTable({self.names})"
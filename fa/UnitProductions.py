@@ -0,0 +1,60 @@
+from .StronglyConnectedComponents import strongly_connected_components
+
+
+class UnitProductionGraph:
+    # unit productions A -> B form a graph that is built once and condensed into SCCs; symbols of
+    # one component share all their non-unit productions, and components are finished sinks-first
+    # so every non-unit production is pushed up the graph once per component instead of once per
+    # reachability search. closure_sizes[A] = number of symbols A reaches through unit rules (A included).
+    def __init__(self, rules, unit_target):
+        symbols = list(rules)
+        index = {symbol: i for i, symbol in enumerate(symbols)}
+        edges = [[] for _ in symbols]
+        own = [[] for _ in symbols]
+        for lhs, rhs_list in rules.items():
+            for rhs in rhs_list:
+                target = unit_target(rhs)
+                if target is None:
+                    own[index[lhs]].append(rhs)
+                    continue
+                if target not in index:
+                    index[target] = len(symbols)
+                    symbols.append(target)
+                    edges.append([])
+                    own.append([])
+                edges[index[lhs]].append(index[target])
+
+        components, component_of = strongly_connected_components(len(symbols), edges)
+        inherited = []
+        reach = []
+        for component_id, component in enumerate(components):
+            productions = {}
+            mask = 0
+            for member in component:
+                mask |= 1 << member
+                for rhs in own[member]:
+                    productions.setdefault(self._key(rhs), rhs)
+            for member in component:
+                for target in edges[member]:
+                    target_component = component_of[target]
+                    if target_component != component_id:
+                        mask |= reach[target_component]
+                        for key, rhs in inherited[target_component].items():
+                            productions.setdefault(key, rhs)
+            inherited.append(productions)
+            reach.append(mask)
+
+        self.productions = {}
+        self.closure_sizes = {}
+        for symbol in rules:
+            component = component_of[index[symbol]]
+            productions = {self._key(rhs): rhs for rhs in own[index[symbol]]}  # own rules keep their place first
+            for key, rhs in inherited[component].items():
+                productions.setdefault(key, rhs)
+            self.productions[symbol] = list(productions.values())
+            self.closure_sizes[symbol] = reach[component].bit_count()
+        self.components = [[symbols[member] for member in component] for component in components]
+
+    @staticmethod
+    def _key(rhs):
+        return tuple(rhs) if isinstance(rhs, list) else rhs
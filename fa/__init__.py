@@ -1,4 +1,13 @@
+from .BitsetNFA import BitsetNFA
+from .CompiledDFA import CompiledDFA
+from .CYKParser import CYKParser
+from .EarleyParser import EarleyParser
 from .FiniteAutomaton import FiniteAutomaton
+from .LazyDFA import LazyDFA
+from .ResultCache import ResultCache, default_cache
+from .StreamMatcher import StreamMatcher
+from .SymbolTable import SymbolTable
 from .Grammar import Grammar
+from .GrammarSampler import GrammarSampler
 
-__all__ = ['Grammar', 'FiniteAutomaton']
+__all__ = ['Grammar', 'FiniteAutomaton', 'CompiledDFA', 'BitsetNFA', 'LazyDFA', 'StreamMatcher', 'CYKParser', 'EarleyParser', 'GrammarSampler', 'SymbolTable', 'ResultCache', 'default_cache']
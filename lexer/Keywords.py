@@ -0,0 +1,50 @@
+import re
+
+from .TokenType import TokenType
+
+# Reserved words, derived once per process from TokenType: every member whose value is a word
+# (or words joined by hyphens) except the token classes. Adding a keyword to TokenType is enough.
+TOKEN_CLASSES = {TokenType.INT, TokenType.STRING, TokenType.ID, TokenType.EOF}
+SEGMENT_PATTERN = re.compile(r"[^\W\d]\w*")  # isalpha / _ then isalnum / _, as Lexer.identifier
+KEYWORD_PATTERN = re.compile(r"[^\W\d]\w*(?:-[^\W\d]\w*)*")
+
+KEYWORDS = {
+    token_type.value: token_type
+    for token_type in TokenType
+    if token_type not in TOKEN_CLASSES and KEYWORD_PATTERN.fullmatch(token_type.value)
+}
+
+
+def _build_trie(words):
+    # trie over the hyphen-separated segments of the keywords: node = {segment: child}, a node that
+    # ends a keyword also has the key None. Only the hyphenated keywords need it, a plain word is
+    # a single dict lookup in KEYWORDS.
+    root = {}
+    for word in words:
+        node = root
+        for segment in word.split('-'):
+            node = node.setdefault(segment, {})
+        node[None] = KEYWORDS[word]
+    return root
+
+
+KEYWORD_TRIE = _build_trie(word for word in KEYWORDS if '-' in word)
+# the same hyphenated keywords for the master pattern, longest first so none shadows another
+COMPOUND_KEYWORDS = sorted((word for word in KEYWORDS if '-' in word), key=len, reverse=True)
+
+
+def match_compound(text, head, end):
+    # longest hyphenated keyword that starts with the identifier head (already scanned, ending at
+    # end) and continues in text; returns (token type, end offset) or None. Segments are matched
+    # greedily, so "cause-effects" is not cut down to the keyword.
+    node = KEYWORD_TRIE.get(head)
+    found = None
+    while node is not None and text.startswith('-', end):
+        match = SEGMENT_PATTERN.match(text, end + 1)
+        if match is None:
+            break
+        node = node.get(match.group())
+        end = match.end()
+        if node is not None and None in node:
+            found = node[None], end
+    return found
@@ -1,3 +1,7 @@
+import sys
+
+from .Keywords import KEYWORDS, match_compound
+from .RegexLexer import RegexLexer
 from .Token import Token
 from .TokenType import TokenType
 
@@ -10,6 +14,24 @@ class Lexer:
         self.column = 1
         self.current_char = self.text[self.pos] if self.text else None
 
+    def __iter__(self):
+        # tokens up to, not including, EOF
+        token = self.get_next_token()
+        while token.type != TokenType.EOF:
+            yield token
+            token = self.get_next_token()
+
+    def tokenize_all(self):
+        # the rest of the text as a columnar TokenBuffer, scanned by RegexLexer's master pattern
+        # from the current position; afterwards only EOF is left
+        lexer = RegexLexer(self.text)
+        lexer.pos, lexer.line, lexer.base = self.pos, self.line, self.pos - self.column
+        buffer = lexer.tokenize_all()
+        self.pos = len(self.text)
+        self.current_char = None
+        self.line, self.column = lexer.locate(self.pos)
+        return buffer
+
     def go_next_char(self):
         if self.current_char == '\n':
             self.line += 1
@@ -43,45 +65,16 @@ class Lexer:
             result += self.current_char
             self.go_next_char()
 
-        # check if id is reserved keyword
-        keywords = {
-            'event': TokenType.EVENT,
-            'period': TokenType.PERIOD,
-            'timeline': TokenType.TIMELINE,
-            'relationship': TokenType.RELATIONSHIP,
-            'main': TokenType.MAIN,
-            'export': TokenType.EXPORT,
-            'if': TokenType.IF,
-            'else': TokenType.ELSE,
-            'for': TokenType.FOR,
-            'in': TokenType.IN,
-            'modify': TokenType.MODIFY,
-            'high': TokenType.HIGH,
-            'medium': TokenType.MEDIUM,
-            'low': TokenType.LOW,
-            'cause-effect': TokenType.CAUSE_EFFECT,
-            'contemporaneous': TokenType.CONTEMPORANEOUS,
-            'precedes': TokenType.PRECEDES,
-            'follows': TokenType.FOLLOWS,
-            'includes': TokenType.INCLUDES,
-            'excludes': TokenType.EXCLUDES,
-            'BCE': TokenType.BCE,
-            'CE': TokenType.CE,
-            'true': TokenType.TRUE,
-            'false': TokenType.FALSE,
-            'title': TokenType.TITLE,
-            'date': TokenType.DATE,
-            'start': TokenType.START,
-            'end': TokenType.END,
-            'importance': TokenType.IMPORTANCE,
-            'from': TokenType.FROM,
-            'to': TokenType.TO,
-            'type': TokenType.TYPE,
-            'year': TokenType.YEAR,
-            'month': TokenType.MONTH,
-            'day': TokenType.DAY
-        }
-        return Token(keywords.get(result, TokenType.ID), result, self.line, col)
+        # check if id is reserved keyword, hyphenated ones continue past the '-'
+        compound = match_compound(self.text, result, self.pos)
+        if compound is not None:
+            token_type, end = compound
+            while self.pos < end:
+                self.go_next_char()
+            return Token(token_type, token_type.value, self.line, col)
+        # interned, so repeated identifiers share one string and keywords get the TokenType value
+        result = sys.intern(result)
+        return Token(KEYWORDS.get(result, TokenType.ID), result, self.line, col)
 
     def string(self):
         result = ""
@@ -0,0 +1,203 @@
+import codecs
+import inspect
+import re
+import sys
+
+from .Keywords import COMPOUND_KEYWORDS, KEYWORDS
+from .Token import Token
+from .TokenBuffer import TokenBuffer
+from .TokenType import TokenType
+
+# every token rule is one alternative of a single pattern; leading blanks are consumed by the
+# same match and match.lastindex tells which rule fired. Newlines are a rule of their own so the
+# scan can count lines without looking at the text a second time.
+TOKEN_PATTERN = re.compile(r'''
+    [^\S\n]*
+    (?:
+        (\n)                            # 1: newline
+      | ((?:{compounds})(?!\w)|[^\W\d]\w*)  # 2: keyword or identifier (isalpha / _ then isalnum / _)
+      | (==|<=|>=|!=|[=,;.(){}\-+<>])   # 3: operators and punctuation
+      | (\d+)                           # 4: INT
+      | ("[^"]*")                       # 5: STRING, may span lines
+    )
+'''.replace('{compounds}', '|'.join(map(re.escape, COMPOUND_KEYWORDS)) or '(?!)'), re.VERBOSE)
+WHITESPACE_PATTERN = re.compile(r"\s*")
+
+OPERATORS = {token_type.value: token_type for token_type in TokenType if not token_type.value[0].isalnum()}
+# TokenBuffer type code of every keyword and operator, by its text
+VALUE_CODES = {value: TokenBuffer.CODES[token_type] for value, token_type in {**KEYWORDS, **OPERATORS}.items()}
+
+
+# a token ending closer than this to the end of a streamed chunk may still grow ("<" into "<=",
+# "cause" into "cause-effect"), so it is only taken once more text has been read behind it
+LOOKAHEAD = max(map(len, COMPOUND_KEYWORDS), default=1) + 1
+
+
+def read_chunks(source, chunk_size=1 << 16, encoding="utf-8"):
+    # str chunks from a text or binary file object, an mmap, or any iterable of str / bytes chunks;
+    # bytes are decoded incrementally, so a character split between two chunks is not broken
+    if hasattr(source, "read"):
+        file = source
+        source = iter(lambda: file.read(chunk_size), file.read(0))
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in source:
+        yield chunk if isinstance(chunk, str) else decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+class RegexLexer:
+    # same Token stream as Lexer (including its positions: INT tokens carry the column after the
+    # number, STRING tokens the line of the closing quote), but one compiled-regex match per token
+    # instead of one Python step per character. The scan runs in a generator that keeps the line
+    # and the offset of the last newline in locals; get_next_token pulls from it.
+    #
+    # text is all the input that is held in memory: the whole source for RegexLexer(text), a
+    # sliding window for from_file, where the scanned prefix is dropped whenever a chunk is read.
+    def __init__(self, text, chunks=()):
+        self.text = text
+        self.pos = 0
+        self.line = 1
+        self.base = -1  # offset of the last newline in text, column = offset - base
+        self.chunks = iter(chunks)
+        self._stream = self.tokens()
+
+    @classmethod
+    def from_file(cls, source, chunk_size=1 << 16, encoding="utf-8"):
+        # lexes a file object, mmap or iterable of chunks without reading it whole; memory stays at
+        # about one chunk plus the longest token
+        return cls("", read_chunks(source, chunk_size, encoding))
+
+    def tokens(self):
+        # every token before EOF; stops at the end of the input or at the first offset no rule
+        # matches, which get_next_token then reports
+        keywords = KEYWORDS.get
+        intern = sys.intern
+        operators = OPERATORS.__getitem__
+        identifier = TokenType.ID
+        integer = TokenType.INT
+        string = TokenType.STRING
+        text, position, line, base = self.text, self.pos, self.line, self.base
+        final = False
+        while True:
+            limit = len(text) if final else len(text) - LOOKAHEAD
+            for match in iter(TOKEN_PATTERN.scanner(text, position).match, None):
+                end = match.end()
+                if end > limit:
+                    break
+                position = end
+                rule = match.lastindex
+                if rule == 1:
+                    line += 1
+                    base = end - 1
+                    continue
+                value = match.group(rule)
+                start = match.start(rule)
+                if rule == 2:
+                    value = intern(value)
+                    yield Token(keywords(value, identifier), value, line, start - base)
+                elif rule == 3:
+                    yield Token(operators(value), value, line, start - base)
+                elif rule == 4:
+                    yield Token(integer, int(value), line, end - base)
+                else:
+                    newlines = value.count('\n')
+                    token = Token(string, value[1:-1], line + newlines, start - base)
+                    if newlines:
+                        line += newlines
+                        base = start + value.rfind('\n')
+                    yield token
+            else:
+                # no rule matches at position: an error unless more text could still complete a
+                # token there (an open string or a match cut by the end of the chunk)
+                offset = WHITESPACE_PATTERN.match(text, position).end()
+                if final or (offset < limit and text[offset] != '"'):
+                    break
+            if final:
+                break
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                final = True
+            else:
+                text = text[position:] + chunk
+                base -= position
+                position = 0
+        self.text, self.pos, self.line, self.base = text, position, line, base
+
+    def __iter__(self):
+        return self.tokens()
+
+    def tokenize_all(self):
+        # the whole input as a TokenBuffer, scanned in one pass without building Tokens; a streamed
+        # lexer reads its remaining chunks first, since values are sliced from the text on demand
+        if inspect.getgeneratorstate(self._stream) != inspect.GEN_CREATED:
+            raise ValueError("tokenize_all() needs a lexer that has not returned tokens yet")
+        text = self.text = self.text + "".join(self.chunks)
+        buffer = TokenBuffer(text)
+        code = VALUE_CODES.get
+        identifier = TokenBuffer.CODES[TokenType.ID]
+        integer = TokenBuffer.CODES[TokenType.INT]
+        string = TokenBuffer.CODES[TokenType.STRING]
+        types, starts, ends = buffer.types.append, buffer.starts.append, buffer.ends.append
+        lines, columns = buffer.lines.append, buffer.columns.append
+        position, line, base = self.pos, self.line, self.base
+        for match in iter(TOKEN_PATTERN.scanner(text, position).match, None):
+            position = end = match.end()
+            rule = match.lastindex
+            if rule == 1:
+                line += 1
+                base = end - 1
+                continue
+            start = match.start(rule)
+            starts(start)
+            ends(end)
+            if rule < 4:
+                types(code(match.group(rule), identifier))
+                lines(line)
+                columns(start - base)
+            elif rule == 4:
+                types(integer)
+                lines(line)
+                columns(end - base)
+            else:
+                types(string)
+                newlines = text.count('\n', start, end)
+                if newlines:
+                    line += newlines
+                    lines(line)
+                    columns(start - base)
+                    base = text.rfind('\n', start, end)
+                else:
+                    lines(line)
+                    columns(start - base)
+        self.pos, self.line, self.base = position, line, base
+        self._stream = iter(())
+        self._end_of_input()  # raises for text no rule matches
+        return buffer
+
+    def locate(self, offset):
+        # (line, column) of a text offset at or after pos, only needed for EOF and errors
+        newlines = self.text.count('\n', self.pos, offset)
+        if newlines:
+            return self.line + newlines, offset - self.text.rfind('\n', self.pos, offset)
+        return self.line, offset - self.base
+
+    def error(self, offset, message="Invalid character"):
+        line, column = self.locate(offset)
+        char = self.text[offset] if offset < len(self.text) else None
+        raise Exception(f"{message} at line {line}, column {column}: '{char}'")
+
+    def get_next_token(self):
+        return next(self._stream, None) or self._end_of_input()
+
+    def _end_of_input(self):
+        # only whitespace left gives EOF, anything else fails at the offset Lexer reports
+        offset = WHITESPACE_PATTERN.match(self.text, self.pos).end()
+        if offset == len(self.text):
+            line, column = self.locate(offset)
+            return Token(TokenType.EOF, None, line, column - 1)
+        char = self.text[offset]
+        if char == '!':
+            self.error(offset + 1)  # '!' must be followed by '='
+        if char == '"':
+            self.error(len(self.text))  # unterminated string
+        self.error(offset)
@@ -0,0 +1,66 @@
+import sys
+from array import array
+
+from .Token import Token
+from .TokenType import TokenType
+
+
+class TokenBuffer:
+    # Columnar token stream from tokenize_all(): parallel arrays instead of one Token per token.
+    # types holds indices into TYPES; starts / ends are text offsets of the token's source
+    # (STRING includes its quotes); lines / columns are the positions a Token would carry. Values
+    # are only sliced from the text when asked for, and token(i) builds the Token on demand.
+    TYPES = list(TokenType)
+    CODES = {token_type: code for code, token_type in enumerate(TYPES)}
+
+    def __init__(self, text):
+        self.text = text
+        self.types = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+        self.lines = array('i')
+        self.columns = array('i')
+
+    def __len__(self):
+        return len(self.types)
+
+    def type(self, index):
+        return self.TYPES[self.types[index]]
+
+    def value(self, index):
+        token_type = self.TYPES[self.types[index]]
+        start, end = self.starts[index], self.ends[index]
+        if token_type is TokenType.INT:
+            return int(self.text[start:end])
+        if token_type is TokenType.STRING:
+            return self.text[start + 1:end - 1]
+        if token_type is TokenType.ID:
+            return sys.intern(self.text[start:end])
+        return token_type.value
+
+    def token(self, index):
+        return Token(self.TYPES[self.types[index]], self.value(index), self.lines[index], self.columns[index])
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("token index out of range")
+        return self.token(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.token(index)
+
+    def to_numpy(self):
+        # zero-copy numpy views of the columns, keyed by array name
+        import numpy as np
+
+        return {
+            name: np.frombuffer(column, dtype=column.typecode)
+            for name, column in (("types", self.types), ("starts", self.starts), ("ends", self.ends),
+                                 ("lines", self.lines), ("columns", self.columns))
+        }
+
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in (self.types, self.starts, self.ends, self.lines, self.columns))
@@ -1,6 +1,8 @@
 from .Token import Token
 from .Lexer import Lexer
+from .RegexLexer import RegexLexer
+from .TokenBuffer import TokenBuffer
 from .TokenType import TokenType
 
-__all__ = ['Token', 'Lexer', 'TokenType']
+__all__ = ['Token', 'Lexer', 'RegexLexer', 'TokenBuffer', 'TokenType']
 
@@ -0,0 +1,78 @@
+from itertools import product
+
+import pytest
+
+from fa import Grammar
+
+from test_parsers import dyck_grammar, lab5_grammar
+
+
+def long_nullable_grammar():
+    # S -> A B C A B c with every A, B, C nullable: the case epsilon_mode="binarize" is for
+    p = {
+        "S": ["ABCABc", "SaS"],
+        "A": ["", "a"],
+        "B": ["", "bB"],
+        "C": ["A", "B", "cC"],
+    }
+    return Grammar({"S", "A", "B", "C"}, {"a", "b", "c"}, p, "S")
+
+
+def words(max_length, alphabet):
+    for length in range(max_length + 1):
+        for word in product(sorted(alphabet), repeat=length):
+            yield "".join(word)
+
+
+def assert_cnf(grammar):
+    starts = set(grammar.S)
+    on_right = set()
+    for lhs, rhs_list in grammar.P.items():
+        assert lhs in grammar.V_n
+        for rhs in rhs_list:
+            symbols = grammar.split_rhs(rhs)
+            if not symbols:
+                assert lhs in starts, f"{lhs} -> empty"
+            elif len(symbols) == 1:
+                assert symbols[0] in grammar.V_t, f"{lhs} -> {rhs}"
+            else:
+                assert len(symbols) == 2 and all(symbol in grammar.V_n for symbol in symbols), f"{lhs} -> {rhs}"
+                on_right.update(symbols)
+    # an empty start rule is only allowed while the start symbol is never on a right-hand side
+    if any(not grammar.split_rhs(rhs) for start in starts for rhs in grammar.P.get(start, ())):
+        assert not starts & on_right
+
+
+@pytest.mark.parametrize("epsilon_mode", ["classic", "binarize"])
+@pytest.mark.parametrize("make_grammar, max_length", [
+    (lab5_grammar, 8),
+    (dyck_grammar, 8),
+    (long_nullable_grammar, 6),
+])
+def test_to_cnf_keeps_the_language(make_grammar, max_length, epsilon_mode):
+    source = make_grammar()
+    before = str(source)
+    cnf = source.to_cnf(epsilon_mode=epsilon_mode)
+    assert str(source) == before
+
+    assert_cnf(cnf)
+    earley = source.earley_parser()
+    cyk = cnf.cyk_parser()
+    for word in words(max_length, source.V_t):
+        assert cyk.accepts(word) == earley.accepts(word), word
+
+
+def test_both_epsilon_modes_agree_with_normalize_cnf(capsys):
+    grammar = lab5_grammar()
+    grammar.normalize_cnf()
+    capsys.readouterr()
+    expected = grammar.cyk_parser()
+    classic = lab5_grammar().to_cnf().cyk_parser()
+    binarized = lab5_grammar().to_cnf(epsilon_mode="binarize").cyk_parser()
+    for word in words(8, "ab"):
+        assert classic.accepts(word) == binarized.accepts(word) == expected.accepts(word), word
+
+
+def test_unknown_epsilon_mode():
+    with pytest.raises(ValueError):
+        lab5_grammar().to_cnf(epsilon_mode="lazy")
@@ -0,0 +1,158 @@
+from itertools import product
+
+from fa import CompiledDFA, FiniteAutomaton
+from fa.IndexedAutomaton import IndexedAutomaton
+
+
+def variant_12_nfa():
+    # the lab 2 automaton: q3 -a-> {q1, q3} makes it non-deterministic
+    transitions = {
+        "q0": {"a": {"q1"}, "b": {"q0"}},
+        "q1": {"a": {"q2"}, "c": {"q1"}},
+        "q2": {"a": {"q3"}},
+        "q3": {"a": {"q1", "q3"}},
+    }
+    return FiniteAutomaton({"q0", "q1", "q2", "q3"}, {"a", "b", "c"}, transitions, "q0", {"q2"})
+
+
+def ends_with_b():
+    transitions = {"p0": {"a": {"p0"}, "b": {"p1"}, "c": {"p0"}}, "p1": {"a": {"p0"}, "b": {"p1"}, "c": {"p0"}}}
+    return FiniteAutomaton({"p0", "p1"}, {"a", "b", "c"}, transitions, "p0", {"p1"})
+
+
+def words(max_length, alphabet="abc"):
+    for length in range(max_length + 1):
+        for word in product(alphabet, repeat=length):
+            yield "".join(word)
+
+
+def test_minimized_dfa_membership():
+    nfa = variant_12_nfa()
+    minimal = nfa.minimize()
+    assert isinstance(minimal.start_state, set)
+    for word in words(6):
+        assert minimal.string_belongs_to_language(word) == nfa.string_belongs_to_language(word), word
+
+
+def test_product_dfa_membership():
+    left, right = variant_12_nfa(), ends_with_b()
+    intersection = left.intersection(right)
+    union = left.union(right)
+    difference = left.difference(right)
+    for word in words(6):
+        in_left, in_right = left.string_belongs_to_language(word), right.string_belongs_to_language(word)
+        assert intersection.string_belongs_to_language(word) == (in_left and in_right), word
+        assert union.string_belongs_to_language(word) == (in_left or in_right), word
+        assert difference.string_belongs_to_language(word) == (in_left and not in_right), word
+
+
+def test_subset_dfa_membership():
+    nfa = variant_12_nfa()
+    dfa = nfa.nfa_to_dfa()
+    for word in words(6):
+        assert dfa.string_belongs_to_language(word) == nfa.string_belongs_to_language(word), word
+
+
+def test_set_state_automata_are_indexed_once(monkeypatch):
+    automata = [variant_12_nfa().nfa_to_dfa(), variant_12_nfa().minimize(), variant_12_nfa().union(ends_with_b())]
+    built = []
+    from_automaton = IndexedAutomaton.from_automaton.__func__
+    monkeypatch.setattr(IndexedAutomaton, "from_automaton", classmethod(lambda cls, fa: built.append(fa) or from_automaton(cls, fa)))
+    for automaton in automata:
+        for word in words(4):
+            automaton.string_belongs_to_language(word)
+    assert len(built) == len(automata)
+
+
+def epsilon_nfa():
+    # a* (b | c): q0 -""-> q1 and q1 -""-> q0 form one closure component
+    transitions = {
+        "q0": {"a": {"q0"}, "": {"q1"}},
+        "q1": {"": {"q0", "q2"}},
+        "q2": {"b": {"q3"}, "c": {"q3"}},
+    }
+    return FiniteAutomaton({"q0", "q1", "q2", "q3"}, {"a", "b", "c"}, transitions, "q0", {"q3"})
+
+
+def test_epsilon_closures_are_built_once():
+    nfa = epsilon_nfa()
+    all_words = list(words(5))
+    expected = [len(word) > 0 and word[-1] in "bc" and set(word[:-1]) <= {"a"} for word in all_words]
+    assert [nfa.string_belongs_to_language(word) for word in all_words] == expected
+    assert nfa.matches_many(all_words).tolist() == expected
+
+    bitset, compiled = nfa.bitset_nfa(), nfa.compile()
+    nfa.string_belongs_to_language("aab")
+    nfa.matches_many(["aab"])
+    assert nfa.bitset_nfa() is bitset and nfa.compile() is compiled
+
+
+def test_edited_automaton_is_rebuilt():
+    nfa = epsilon_nfa()
+    assert not nfa.string_belongs_to_language("bb")
+
+    nfa.transitions["q3"] = {"b": {"q3"}}
+    nfa.invalidate()
+    assert nfa.string_belongs_to_language("bb")
+
+    nfa.accept_states = {"q0"}
+    assert nfa.string_belongs_to_language("aa")
+    assert not nfa.string_belongs_to_language("bb")
+
+
+def test_saved_automaton_loads_as_compiled_dfa(tmp_path):
+    nfa = variant_12_nfa()
+    path = str(tmp_path / "nfa.bin")
+    nfa.save(path)
+    loaded = CompiledDFA.load(path)
+    restored = loaded.to_finite_automaton()
+    for word in words(6):
+        expected = nfa.string_belongs_to_language(word)
+        assert loaded.matches(word) == expected, word
+        assert restored.string_belongs_to_language(word) == expected, word
+
+
+def mixed_alphabet_dfa():
+    # (ab | c)* ab over the symbols "ab" and "c"
+    transitions = {
+        "q0": {"ab": {"q1"}, "c": {"q0"}},
+        "q1": {"ab": {"q1"}, "c": {"q0"}},
+    }
+    return FiniteAutomaton({"q0", "q1"}, {"ab", "c"}, transitions, "q0", {"q1"})
+
+
+MIXED_WORDS = {
+    "": False, "ab": True, "abcab": True, "abab": True, "cab": True,
+    "c": False, "a": False, "b": False, "abc": False, "ba": False, "aab": False, "abx": False,
+}
+
+
+def test_mixed_alphabet_in_every_matcher():
+    automaton = mixed_alphabet_dfa()
+    nfa = FiniteAutomaton({"p0", "p1"}, {"ab", "c"}, {"p0": {"ab": {"p0", "p1"}, "c": {"p0"}}}, "p0", {"p1"})
+    compiled = automaton.compile()
+    words_list = list(MIXED_WORDS)
+    expected = list(MIXED_WORDS.values())
+
+    assert [automaton.string_belongs_to_language(word) for word in words_list] == expected
+    assert [nfa.string_belongs_to_language(word) for word in words_list] == expected
+    assert [compiled.matches(word) for word in words_list] == expected
+    assert automaton.matches_many(words_list).tolist() == expected
+    assert nfa.matches_many(words_list).tolist() == expected
+    assert [nfa.bitset_nfa().matches(word) for word in words_list] == expected
+    assert [nfa.lazy_dfa().matches(word) for word in words_list] == expected
+    assert compiled.matches(["ab", "c", "ab"])
+
+
+def test_mixed_alphabet_stream_across_chunks():
+    automaton = mixed_alphabet_dfa()
+    for word, expected in MIXED_WORDS.items():
+        for cut in range(len(word) + 1):
+            matcher = automaton.stream_matcher().feed(word[:cut]).feed(word[cut:])
+            assert matcher.result() == expected, (word, cut)
+            assert matcher.result() == expected, (word, cut)
+            assert automaton.stream_matcher().feed(word[:cut].encode()).feed(word[cut:].encode()).result() == expected
+    matcher = automaton.stream_matcher()
+    for char in "cabcab":
+        matcher.feed(char)
+    assert matcher.result()
@@ -0,0 +1,149 @@
+import json
+import os
+
+import pytest
+
+from fa import Grammar, ResultCache
+
+
+def right_linear_grammar():
+    return Grammar({"S", "A"}, {"a", "b"}, {"S": ["aA", "b"], "A": ["bS", "a"]}, "S")
+
+
+def test_symbol_table_follows_renamed_symbol():
+    grammar = right_linear_grammar()
+    assert grammar.split_rhs("aAB") == ["a", "A", "B"]
+    grammar.get_grammar_type()
+
+    # rename A to AB in place: same sets, same sizes, so the edit is announced with invalidate()
+    grammar.V_n.discard("A")
+    grammar.V_n.add("AB")
+    grammar.P["AB"] = grammar.P.pop("A")
+    grammar.P["S"] = ["aAB", "b"]
+    grammar.invalidate()
+
+    assert grammar.split_rhs("aAB") == ["a", "AB"]
+    assert -1 not in grammar.encode("aAB")
+    assert grammar.get_grammar_type() == (3, "Type 3 - Right Linear Regular Grammar")
+
+
+def test_symbol_table_follows_replaced_sets():
+    grammar = right_linear_grammar()
+    grammar.symbol_table()
+    grammar.V_t = {"a", "c"}
+    assert "c" in grammar.symbol_table()
+    assert "b" not in grammar.symbol_table()
+
+
+def test_containers_are_not_copied():
+    rules = {"S": ["aA", "b"], "A": ["bS", "a"]}
+    grammar = Grammar({"S", "A"}, {"a", "b"}, rules, "S")
+    assert grammar.P is rules
+    rules["S"].append("AbA")
+    grammar.invalidate()
+    assert grammar.get_grammar_type() == (2, "Type 2 - Context-Free Grammar")
+
+
+def test_grammar_type_follows_direct_rule_edits():
+    grammar = right_linear_grammar()
+    assert grammar.get_grammar_type() == (3, "Type 3 - Right Linear Regular Grammar")
+
+    grammar.P["S"].append("AbA")
+    grammar.invalidate()
+    assert grammar.get_grammar_type() == (2, "Type 2 - Context-Free Grammar")
+    fresh = Grammar(set(grammar.V_n), set(grammar.V_t), {lhs: list(rules) for lhs, rules in grammar.P.items()}, "S")
+    assert grammar.get_grammar_type() == fresh.get_grammar_type()
+
+    grammar.P["S"][-1] = "a"
+    grammar.invalidate()
+    assert grammar.get_grammar_type() == (3, "Type 3 - Right Linear Regular Grammar")
+
+    grammar.P = {"S": ["Sa", "b"]}
+    assert grammar.get_grammar_type()[0] == 3
+    assert grammar.get_grammar_type() != (3, "Type 3 - Right Linear Regular Grammar")
+
+
+def test_grammar_type_follows_add_and_remove_production():
+    grammar = right_linear_grammar()
+    grammar.add_production("A", "aS")
+    assert grammar.get_grammar_type() == (3, "Type 3 - Right Linear Regular Grammar")
+    grammar.add_production("S", "SS")
+    assert grammar.get_grammar_type() == (2, "Type 2 - Context-Free Grammar")
+    grammar.add_production("A", "b")
+    assert grammar.get_grammar_type() == (2, "Type 2 - Context-Free Grammar")
+    grammar.remove_production("S", "SS")
+    assert grammar.get_grammar_type() == (3, "Type 3 - Right Linear Regular Grammar")
+
+
+def test_normalisation_steps_invalidate_the_caches(capsys):
+    grammar = Grammar({"S", "A"}, {"a", "b"}, {"S": ["aAb", "A"], "A": ["a", ""]}, "S")
+    assert grammar.get_grammar_type() == (2, "Type 2 - Context-Free Grammar")
+    grammar.normalize_cnf()
+    capsys.readouterr()
+    assert "X0" in grammar.symbol_table() and "T_a" in grammar.symbol_table()
+    assert -1 not in grammar.encode(["T_a", "X0"])
+    assert grammar.get_grammar_type() == Grammar(
+        set(grammar.V_n), set(grammar.V_t), {lhs: list(rules) for lhs, rules in grammar.P.items()}, grammar.S
+    ).get_grammar_type()
+
+
+def test_cached_normalize_cnf_replays_only_the_same_grammar(capsys, tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+
+    def grammar(rules):
+        return Grammar({"S", "A"}, {"a", "b"}, {"S": rules, "A": ["a", "bA"]}, "S")
+
+    first = grammar(["aA", "b"])
+    first_steps = first.normalize_cnf(cache)
+    first.P["S"].append("ab")  # later edits of the normalised grammar do not reach the cache
+    again = grammar(["aA", "b"])
+    again_steps = again.normalize_cnf(cache)
+    assert cache.stats()["hits"] == 1
+    assert again_steps == first_steps
+    assert "ab" not in again.P["S"]
+
+    # same language and canonical hash, but written in another order: its own steps, not a replay
+    reordered = grammar(["b", "aA"])
+    reordered_steps = reordered.normalize_cnf(cache)
+    assert cache.stats()["hits"] == 1
+    assert grammar(["b", "aA"]).canonical_hash() == grammar(["aA", "b"]).canonical_hash()
+    assert reordered_steps["Original Grammar:"] == str(grammar(["b", "aA"]))
+    assert reordered_steps == grammar(["b", "aA"]).normalize_cnf()
+
+    # a new process reads the JSON entries of the directory, written behind by flush()
+    assert not os.listdir(tmp_path)
+    cache.flush()
+    restored = grammar(["aA", "b"])
+    assert restored.normalize_cnf(ResultCache(directory=str(tmp_path))) == first_steps
+    assert (restored.V_n, restored.V_t, restored.P, restored.S) == (again.V_n, again.V_t, again.P, again.S)
+    assert all(name.endswith(".json") for name in os.listdir(tmp_path / "normalize_cnf"))
+    capsys.readouterr()
+
+
+def test_cached_conversion_is_shared(tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+    grammar = right_linear_grammar()
+    automaton = grammar.to_finite_automaton(cache)
+    assert grammar.to_finite_automaton(cache) is automaton
+    assert right_linear_grammar().to_finite_automaton(cache) is automaton
+
+    cache.flush()
+    loaded = right_linear_grammar().to_finite_automaton(ResultCache(directory=str(tmp_path)))
+    assert loaded is not automaton
+    for word in ("ab", "abab", "b", "aa", "aba", ""):
+        assert loaded.string_belongs_to_language(word) == automaton.string_belongs_to_language(word)
+
+
+def test_cache_entries_are_data(tmp_path):
+    from fa.ResultCache import from_data, to_data
+
+    automaton = right_linear_grammar().to_finite_automaton()
+    dfa = automaton.nfa_to_dfa()
+    compiled = automaton.compile()
+    for value in (automaton, dfa, compiled):
+        restored = from_data(json.loads(json.dumps(to_data(value))))
+        assert type(restored) is type(value)
+    restored = from_data(json.loads(json.dumps(to_data(dfa))))
+    assert restored.transitions == dfa.transitions and restored.start_state == dfa.start_state
+    with pytest.raises(TypeError):
+        to_data(object())
@@ -0,0 +1,22 @@
+from fa import Grammar
+
+
+def test_sample_without_a_start_symbol():
+    grammar = Grammar({"A"}, {"a"}, {"A": ["a", "aA"]}, "S")
+    sampler = grammar.sampler(seed=1)
+    assert sampler.sample() is None
+    assert list(sampler.strings(3)) == []
+
+
+def test_sample_from_unproductive_start():
+    grammar = Grammar({"S", "A"}, {"a"}, {"S": ["aS"], "A": ["a"]}, "S")
+    assert grammar.sampler(seed=1).sample() is None
+
+
+def test_samples_are_seeded_and_bounded():
+    grammar = Grammar({"S", "C"}, {"a", "b"}, {"S": ["aSb", "CSC", ""], "C": ["", "C"]}, "S")
+    first = list(grammar.sampler(seed=7).strings(50, max_length=12))
+    assert first == list(grammar.sampler(seed=7).strings(50, max_length=12))
+    parser = grammar.earley_parser()
+    for word in first:
+        assert len(word) <= 12 and parser.accepts(word), word
@@ -0,0 +1,185 @@
+import io
+import mmap
+import os
+import random
+
+import pytest
+
+from lexer import Lexer, RegexLexer, Token, TokenBuffer, TokenType
+from lexer.RegexLexer import LOOKAHEAD
+
+
+def test_token_type_values_are_the_source_text():
+    assert TokenType("event") is TokenType.EVENT
+    assert TokenType("cause-effect") is TokenType.CAUSE_EFFECT
+    assert TokenType("<=") is TokenType.LE
+    assert TokenType.EVENT.value == "event"
+    assert str(TokenType.EVENT) == "TokenType.EVENT"
+    assert all(TokenType)
+    with pytest.raises(ValueError):
+        TokenType("cause")
+
+
+def test_token_has_no_instance_dict():
+    token = Token(TokenType.ID, "x", 1, 1)
+    assert not hasattr(token, "__dict__")
+    with pytest.raises(AttributeError):
+        token.length = 1
+
+
+def test_token_buffer_codes():
+    assert len(TokenBuffer.CODES) == len(TokenType)
+    for token_type, code in TokenBuffer.CODES.items():
+        assert TokenBuffer.TYPES[code] is token_type
+
+
+def test_keyword_tokens_carry_their_text():
+    for lexer in (Lexer("event cause-effect <="), RegexLexer("event cause-effect <=")):
+        tokens = [(token.type, token.value) for token in lexer]
+        assert tokens == [(TokenType.EVENT, "event"), (TokenType.CAUSE_EFFECT, "cause-effect"), (TokenType.LE, "<=")]
+
+
+PIECES = [
+    "event", " ", "\n", "\t", "12", "x_1", '"ab\ncd"', '"', "=", "==", "!", "!=", "<", "<=", ">", ">=", "(", ")",
+    "{", "}", ";", ",", ".", "-", "+", "BCE", "cause-effect", "é", "日本", "\r\n", "#", "4a", "_", "\x0b", "　",
+    "cause", "effect", "effects", "cause-effect_x", "cause-effect-", "-effect",
+]
+
+
+def lex(lexer):
+    # (type, value, line, column) of every token up to EOF, or ("ERR", message) at a lexing error
+    tokens = []
+    try:
+        while True:
+            token = lexer.get_next_token()
+            tokens.append((token.type, token.value, token.line, token.column))
+            if token.type == TokenType.EOF:
+                return tokens
+    except Exception as error:
+        return tokens + [("ERR", str(error))]
+
+
+def lex_all(lexer):
+    # the same through tokenize_all(); a lexing error drops the tokens, as tokenize_all raises
+    try:
+        buffer = lexer.tokenize_all()
+        eof = lexer.get_next_token()
+    except Exception as error:
+        return [("ERR", str(error))]
+    return [(token.type, token.value, token.line, token.column) for token in buffer] + [
+        (eof.type, eof.value, eof.line, eof.column)
+    ]
+
+
+def engines(text):
+    # every way of lexing text, by name; the streamed ones read it in very small chunks
+    chunk_size = len(text) % 5 + 1
+    return {
+        "RegexLexer": lambda: RegexLexer(text),
+        "from_file": lambda: RegexLexer.from_file(io.StringIO(text), chunk_size=chunk_size),
+        "from_file, bytes": lambda: RegexLexer.from_file(io.BytesIO(text.encode()), chunk_size=chunk_size),
+    }
+
+
+def assert_same_tokens(text):
+    expected = lex(Lexer(text))
+    expected_all = [expected[-1]] if expected[-1][0] == "ERR" else expected
+    for name, make in engines(text).items():
+        assert lex(make()) == expected, (name, text)
+        assert lex_all(make()) == expected_all, (name, text)
+    assert lex_all(Lexer(text)) == expected_all, text
+
+
+def test_engines_agree_on_random_input():
+    rng = random.Random(0)
+    for _ in range(3000):
+        assert_same_tokens("".join(rng.choice(PIECES) for _ in range(rng.randint(0, 15))))
+
+
+def test_engines_agree_on_the_lab_input():
+    with open(os.path.join(os.path.dirname(__file__), "..", "3_lexer_scanner", "input.dsl")) as file:
+        text = file.read()
+    assert_same_tokens(text)
+    assert lex(RegexLexer.from_file(io.StringIO(text), chunk_size=7)) == lex(Lexer(text))
+
+
+@pytest.mark.parametrize("tail", ["cause-effect", "cause-effects", "cause-", "cause", "<=", "!=", '"a\nb"', "12"])
+def test_tokens_straddling_chunks_near_the_lookahead(tail):
+    # the token ends at every offset around LOOKAHEAD from the end of the first chunk
+    for padding in range(2 * LOOKAHEAD + 2):
+        text = " " * padding + tail + " x"
+        expected = lex(Lexer(text))
+        for chunk_size in (LOOKAHEAD - 1, LOOKAHEAD, LOOKAHEAD + 1, len(text) - 1):
+            if chunk_size > 0:
+                assert lex(RegexLexer.from_file(io.StringIO(text), chunk_size=chunk_size)) == expected, (text, chunk_size)
+
+
+def test_tokenize_all_continues_a_started_lexer():
+    rng = random.Random(1)
+    for _ in range(1000):
+        text = "".join(rng.choice(PIECES) for _ in range(rng.randint(0, 15)))
+        expected = lex(Lexer(text))
+        lexer = Lexer(text)
+        tokens = []
+        try:
+            for _ in range(rng.randint(0, 3)):
+                token = lexer.get_next_token()
+                tokens.append((token.type, token.value, token.line, token.column))
+                if token.type == TokenType.EOF:
+                    break
+            else:
+                tokens += lex_all(lexer)
+        except Exception as error:
+            tokens.append(("ERR", str(error)))
+        if tokens[-1][0] == "ERR":
+            assert expected[-1] == tokens[-1], text
+        else:
+            assert tokens == expected, text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("cause-effect", [(TokenType.CAUSE_EFFECT, "cause-effect")]),
+    ("cause", [(TokenType.ID, "cause")]),
+    ("cause-", [(TokenType.ID, "cause"), (TokenType.DASH, "-")]),
+    ("cause-effectx", [(TokenType.ID, "cause"), (TokenType.DASH, "-"), (TokenType.ID, "effectx")]),
+    ("cause-effect-", [(TokenType.CAUSE_EFFECT, "cause-effect"), (TokenType.DASH, "-")]),
+    ("cause - effect", [(TokenType.ID, "cause"), (TokenType.DASH, "-"), (TokenType.ID, "effect")]),
+    ("cause-effect;cause", [(TokenType.CAUSE_EFFECT, "cause-effect"), (TokenType.SEMI, ";"), (TokenType.ID, "cause")]),
+])
+def test_compound_keywords(text, expected):
+    for name, make in {"Lexer": lambda: Lexer(text), **engines(text)}.items():
+        assert [(token.type, token.value) for token in make()] == expected, name
+    for chunk_size in range(1, len(text) + 1):
+        lexer = RegexLexer.from_file(io.StringIO(text), chunk_size=chunk_size)
+        assert [(token.type, token.value) for token in lexer] == expected, chunk_size
+
+
+def test_token_buffer_round_trip():
+    text = 'event e1 {\n    title = "two\nlines";\n    date = 12-03-1999 BCE;\n    type = cause-effect;\n}\n'
+    tokens = [(token.type, token.value, token.line, token.column) for token in RegexLexer(text)]
+    buffer = RegexLexer(text).tokenize_all()
+    assert len(buffer) == len(tokens)
+    assert [(token.type, token.value, token.line, token.column) for token in buffer] == tokens
+    for index, (token_type, value, line, column) in enumerate(tokens):
+        assert buffer.type(index) is token_type and buffer.value(index) == value
+        assert (buffer.lines[index], buffer.columns[index]) == (line, column)
+    assert buffer[-1].type is TokenType.RCURLY and buffer[0].value == "event"
+    with pytest.raises(IndexError):
+        buffer[len(tokens)]
+    assert buffer.nbytes() == len(tokens) * (1 + 8 + 8 + 4 + 4)
+
+
+def test_token_buffer_to_numpy():
+    np = pytest.importorskip("numpy")
+    buffer = RegexLexer("event x { date = 1 ; }").tokenize_all()
+    columns = buffer.to_numpy()
+    assert list(columns["types"]) == list(buffer.types) and list(columns["starts"]) == list(buffer.starts)
+    assert columns["types"].dtype == np.uint8
+
+
+def test_from_file_reads_an_mmap(tmp_path):
+    path = tmp_path / "input.dsl"
+    text = 'period p { title = "é"; start = 1 BCE; end = 2 CE; type = cause-effect; }\n' * 50
+    path.write_text(text, encoding="utf-8")
+    with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert lex(RegexLexer.from_file(mapped, chunk_size=7)) == lex(Lexer(text))
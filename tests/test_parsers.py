@@ -0,0 +1,106 @@
+from itertools import product
+
+from fa import CYKParser, EarleyParser, Grammar
+
+
+def lab5_grammar():
+    # variant 12 from 5_chomsky_normal_form/main.py, with an empty rule and an unreachable C
+    p = {
+        "S": ["A"],
+        "A": ["aX", "bX"],
+        "X": ["", "BX", "b"],
+        "B": ["AD"],
+        "D": ["aD", "a"],
+        "C": ["Ca"],
+    }
+    return Grammar({"S", "A", "B", "C", "D", "X"}, {"a", "b"}, p, {"S"})
+
+
+def dyck_grammar():
+    return Grammar({"S"}, {"(", ")"}, {"S": ["", "(S)", "SS"]}, "S")
+
+
+def balanced(word):
+    depth = 0
+    for char in word:
+        depth += 1 if char == "(" else -1
+        if depth < 0:
+            return False
+    return depth == 0
+
+
+def words(max_length, alphabet):
+    for length in range(max_length + 1):
+        for word in product(alphabet, repeat=length):
+            yield "".join(word)
+
+
+def forest_yield(forest, node):
+    # the word spelled by the first derivation below node, checking every alternative's spans
+    symbol, i, j = node
+    for alternative in forest[node]:
+        if len(alternative) == 1:
+            assert j == i + 1
+        else:
+            (_, left_i, k), (_, right_k, right_j) = alternative
+            assert (left_i, right_k, right_j) == (i, k, j)
+    first = forest[node][0]
+    if len(first) == 1:
+        return first[0]
+    return forest_yield(forest, first[0]) + forest_yield(forest, first[1])
+
+
+def test_lab5_grammar_members():
+    earley = EarleyParser(lab5_grammar())
+    cyk = CYKParser(lab5_grammar().to_cnf())
+    for word in ("a", "b", "ab", "bb", "aaab"):
+        assert earley.accepts(word) and cyk.accepts(word), word
+    for word in ("", "aa", "ba", "bab", "c"):
+        assert not earley.accepts(word) and not cyk.accepts(word), word
+
+
+def test_cyk_and_earley_agree_on_lab5_grammar():
+    grammar = lab5_grammar()
+    earley = grammar.earley_parser()
+    cyk = grammar.to_cnf().cyk_parser()
+    for word in words(8, "ab"):
+        assert cyk.accepts(word) == earley.accepts(word), word
+
+
+def test_cyk_and_earley_recognise_dyck_words():
+    grammar = dyck_grammar()
+    earley = grammar.earley_parser()
+    cyk = grammar.to_cnf().cyk_parser()
+    assert earley.accepts("") and cyk.accepts("")
+    for word in words(10, "()"):
+        assert earley.accepts(word) == balanced(word), word
+        assert cyk.accepts(word) == balanced(word), word
+    assert not earley.accepts("(a)") and not cyk.accepts("(a)")
+
+
+def test_parse_forest_covers_members_only():
+    cnf = dyck_grammar().to_cnf()
+    cyk = cnf.cyk_parser()
+    for word in words(8, "()"):
+        result = cyk.parse_forest(word)
+        if not word or not balanced(word):
+            assert result is None, word
+            continue
+        roots, forest = result
+        assert roots and all(root[0] in cnf.S and root[1:] == (0, len(word)) for root in roots)
+        for root in roots:
+            assert forest_yield(forest, root) == word
+
+
+def test_parse_forest_packs_ambiguous_derivations():
+    roots, forest = dyck_grammar().to_cnf().cyk_parser().parse_forest("()()()")
+
+    def trees(node):
+        total = 0
+        for alternative in forest[node]:
+            total += 1 if len(alternative) == 1 else trees(alternative[0]) * trees(alternative[1])
+        return total
+
+    # S S S splits as (S S) S and S (S S), both packed under the same root node
+    assert len(roots) == 1
+    assert trees(roots[0]) >= 2
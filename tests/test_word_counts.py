@@ -0,0 +1,49 @@
+from itertools import product
+
+import pytest
+
+from fa import Grammar
+
+
+def lab1_grammar():
+    return Grammar({"S", "F", "D"}, {"a", "b", "c"}, {"S": ["aF", "bS"], "F": ["bF", "cD", "a"], "D": ["cS", "a"]}, "S")
+
+
+def brute_force_counts(grammar, max_length):
+    parser = grammar.earley_parser()
+    alphabet = sorted(grammar.V_t)
+    return [sum(parser.accepts("".join(word)) for word in product(alphabet, repeat=n)) for n in range(max_length + 1)]
+
+
+CATALAN = [1, 0, 1, 0, 2, 0, 5, 0, 14, 0, 42, 0, 132]
+
+
+def test_regular_grammar_counts_and_words():
+    grammar = lab1_grammar()
+    counts = grammar.count_words(9)
+    assert counts == brute_force_counts(grammar, 9)
+    listed = list(grammar.enumerate_words(9))
+    assert [sum(len(word) == n for word in listed) for n in range(10)] == counts
+    assert listed == sorted(listed, key=lambda word: (len(word), word))
+    assert grammar.count_words(60)[60] > 0
+
+
+def test_unambiguous_grammar_counts_by_derivations():
+    dyck = Grammar({"S"}, {"(", ")"}, {"S": ["", "(S)S"]}, "S")
+    assert dyck.count_words(12) == CATALAN
+    assert dyck.count_words(12, unambiguous=True) == CATALAN
+    assert dyck.count_words(40, unambiguous=True)[40] == 6564120420
+
+
+def test_ambiguous_grammar_counts_distinct_words():
+    dyck = Grammar({"S"}, {"(", ")"}, {"S": ["", "(S)", "SS"]}, "S")
+    assert dyck.count_words(10) == CATALAN[:11]
+    assert dyck.count_words(10) == brute_force_counts(dyck, 10)
+    # every word of ()()() shape has several derivations, so derivation counts are too high
+    assert dyck.count_words(10, unambiguous=True)[6] > CATALAN[6]
+
+
+def test_enumeration_limit():
+    dyck = Grammar({"S"}, {"(", ")"}, {"S": ["", "(S)", "SS"]}, "S")
+    with pytest.raises(ValueError):
+        dyck.count_words(12, limit=100)